@@ -1,77 +1,152 @@
 """
 API Routes for the application
 """
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, BackgroundTasks, Request
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse, JSONResponse, Response
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Optional
+import asyncio
 import logging
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
+
+import aiofiles
 
 from app.db.database import get_db
 from app.db.models import Document, DocumentStatus, Analysis
+from app.core.cache import analysis_cache_key, document_cache_key, response_cache
 from app.core.config import settings
 from app.schemas.document import DocumentResponse, AnalysisResponse, DocumentUploadResponse
 from app.services.document_service import DocumentService
 from app.services.analysis_service import AnalysisService
+from app.utils.file_utils import client_basename
+from app.utils.upload_stream import StreamingFileUpload, UploadStreamError
+from app.tasks import process_document_analysis
 
 logger = logging.getLogger(__name__)
+
+# Handlers that only touch the sync Session are declared with plain ``def`` so
+# FastAPI runs them in its threadpool instead of blocking the event loop.
 router = APIRouter()
 
+# Dedicated pool for upload disk writes so they don't compete with the default executor
+upload_io_executor = ThreadPoolExecutor(
+    max_workers=settings.WORKERS * 2,
+    thread_name_prefix="upload-io"
+)
+
+# Allowance for multipart boundaries and part headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# Validates and serializes a whole page of documents in one pydantic-core call
+document_list_adapter = TypeAdapter(List[DocumentResponse])
+
+
+# The body is parsed by StreamingFileUpload, so document the form field explicitly
+UPLOAD_REQUEST_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            }
+        },
+    }
+}
+
 
-@router.post("/upload", response_model=DocumentUploadResponse)
+@router.post("/upload", response_model=DocumentUploadResponse, openapi_extra=UPLOAD_REQUEST_SCHEMA)
 async def upload_document(
-    file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = None,
-    db: Session = Depends(get_db),
-    request: Request = None
+    request: Request,
+    db: Session = Depends(get_db)
 ):
     """
     Upload a document for processing
     """
-    # Validate file size
+    max_upload_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    
+    # Reject oversize bodies from the declared length before reading them
+    try:
+        content_length = int(request.headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length header")
+    if content_length > max_upload_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB"
+        )
+    
+    # Read up to the file part's headers; its bytes are streamed below
+    try:
+        upload = StreamingFileUpload(request, field_name="file")
+        await upload.start()
+    except UploadStreamError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Never trust directory components in the client's filename
+    original_filename = client_basename(upload.filename or "")
+    
+    # Validate file extension before touching disk
+    file_ext = Path(original_filename).suffix.lower().lstrip('.')
+    if file_ext not in settings.allowed_extensions_list:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File type not allowed. Allowed types: {', '.join(sorted(settings.allowed_extensions_list))}"
+        )
+    
+    # Create document service
+    doc_service = DocumentService(db)
+    
+    # Stream straight into the final storage location
     file_size = 0
-    temp_path = Path(settings.TEMP_UPLOAD_DIR) / f"temp_{datetime.now().timestamp()}_{file.filename}"
+    dest_path = await asyncio.to_thread(doc_service.allocate_upload_path, original_filename)
+    stored = False
     
     try:
-        with temp_path.open("wb") as buffer:
-            while chunk := await file.read(1024 * 1024):  # Read 1MB chunks
+        async with aiofiles.open(dest_path, "wb", executor=upload_io_executor) as buffer:
+            async for chunk in upload.iter_data(min_chunk_size=1024 * 1024):  # Write ~1MB chunks
                 file_size += len(chunk)
-                if file_size > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+                if file_size > max_upload_bytes:
                     raise HTTPException(
                         status_code=413,
                         detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE_MB}MB"
                     )
-                buffer.write(chunk)
-        
-        # Validate file extension
-        file_ext = Path(file.filename).suffix.lower().lstrip('.')
-        if file_ext not in settings.allowed_extensions_list:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File type not allowed. Allowed types: {', '.join(settings.allowed_extensions_list)}"
-            )
-        
-        # Create document service
-        doc_service = DocumentService(db)
+                await buffer.write(chunk)
         
         # Save document
         document = await doc_service.save_document(
-            file_path=str(temp_path),
-            original_filename=file.filename,
-            mime_type=file.content_type or "application/octet-stream",
+            file_path=str(dest_path),
+            original_filename=original_filename,
+            mime_type=upload.content_type or "application/octet-stream",
             file_size=file_size,
-            upload_ip=request.client.host if request else None
+            upload_ip=request.client.host if request.client else None
         )
+        stored = True
         
-        # Schedule background processing
-        if background_tasks:
-            background_tasks.add_task(
-                process_document_background,
+        # Queue processing on the analysis workers (broker publish is a blocking socket write)
+        try:
+            await asyncio.to_thread(process_document_analysis.delay, document.id)
+        except Exception as e:
+            # The upload itself succeeded; record the failure on the document so a
+            # retrying client doesn't create a duplicate
+            logger.error(f"Error queuing document {document.id} for analysis: {str(e)}", exc_info=True)
+            await asyncio.to_thread(
+                doc_service.update_status,
                 document.id,
-                request.app.state
+                DocumentStatus.FAILED,
+                error=f"Could not queue analysis: {str(e)}"
+            )
+            return DocumentUploadResponse(
+                id=document.id,
+                filename=document.filename,
+                original_filename=document.original_filename,
+                status=DocumentStatus.FAILED.value,
+                message="Document uploaded, but it could not be queued for processing."
             )
         
         return DocumentUploadResponse(
@@ -84,48 +159,64 @@ async def upload_document(
         
     except HTTPException:
         raise
+    except UploadStreamError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error uploading document: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Error uploading document")
     finally:
-        # Cleanup temp file if it exists
-        if temp_path.exists():
+        # Remove partially written or unrecorded files
+        if not stored and dest_path.exists():
             try:
-                temp_path.unlink()
+                dest_path.unlink()
             except:
                 pass
 
 
 @router.get("/documents/{document_id}", response_model=DocumentResponse)
-async def get_document(document_id: int, db: Session = Depends(get_db)):
+def get_document(document_id: int, db: Session = Depends(get_db)):
     """
     Get document details and processing status
     """
+    cache_key = document_cache_key(document_id)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return Response(content=cached, media_type="application/json")
+    
     doc_service = DocumentService(db)
     document = doc_service.get_document(document_id)
     
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    return DocumentResponse.from_orm(document)
+    response = DocumentResponse.model_validate(document)
+    response_cache.set(cache_key, response.model_dump_json().encode(), settings.DOCUMENT_CACHE_TTL)
+    return response
 
 
 @router.get("/documents/{document_id}/analysis", response_model=AnalysisResponse)
-async def get_analysis(document_id: int, db: Session = Depends(get_db)):
+def get_analysis(document_id: int, db: Session = Depends(get_db)):
     """
     Get analysis results for a document
     """
+    cache_key = analysis_cache_key(document_id)
+    cached = response_cache.get(cache_key)
+    if cached:
+        return Response(content=cached, media_type="application/json")
+    
     analysis_service = AnalysisService(db)
     analysis = analysis_service.get_analysis(document_id)
     
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    return AnalysisResponse.from_orm(analysis)
+    response = AnalysisResponse.model_validate(analysis)
+    response_cache.set(cache_key, response.model_dump_json().encode(), settings.ANALYSIS_CACHE_TTL)
+    return response
 
 
 @router.get("/documents/{document_id}/report")
-async def download_report(document_id: int, db: Session = Depends(get_db)):
+def download_report(document_id: int, db: Session = Depends(get_db)):
     """
     Download the generated report
     """
@@ -136,22 +227,35 @@ async def download_report(document_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Report not found")
     
     report_path = Path(analysis.report_path)
-    if not report_path.exists():
+    try:
+        stat_result = report_path.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Report file not found")
     
+    download_name = f"cost_analysis_report_{document_id}.pdf"
+    
+    # Behind Nginx, hand the transfer to its sendfile path
+    if settings.REPORT_X_ACCEL_PREFIX:
+        return Response(
+            media_type="application/pdf",
+            headers={
+                "X-Accel-Redirect": f"{settings.REPORT_X_ACCEL_PREFIX.rstrip('/')}/{report_path.name}",
+                "Content-Disposition": f'attachment; filename="{download_name}"',
+            }
+        )
+    
     return FileResponse(
         path=str(report_path),
-        filename=f"cost_analysis_report_{document_id}.pdf",
-        media_type="application/pdf"
+        filename=download_name,
+        media_type="application/pdf",
+        stat_result=stat_result
     )
 
 
 @router.post("/documents/{document_id}/analyze")
-async def analyze_document(
+def analyze_document(
     document_id: int,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    request: Request = None
+    db: Session = Depends(get_db)
 ):
     """
     Trigger analysis for an uploaded document
@@ -168,18 +272,23 @@ async def analyze_document(
             detail=f"Document must be in COMPLETED status. Current status: {document.status}"
         )
     
-    # Schedule analysis
-    background_tasks.add_task(
-        process_document_background,
-        document.id,
-        request.app.state
-    )
+    # Queue analysis on the analysis workers
+    try:
+        process_document_analysis.delay(document.id)
+    except Exception as e:
+        logger.error(f"Error queuing document {document_id} for analysis: {str(e)}", exc_info=True)
+        doc_service.update_status(
+            document_id,
+            DocumentStatus.FAILED,
+            error=f"Could not queue analysis: {str(e)}"
+        )
+        raise HTTPException(status_code=503, detail="Analysis could not be queued")
     
     return {"message": "Analysis started", "document_id": document_id}
 
 
 @router.get("/documents")
-async def list_documents(
+def list_documents(
     skip: int = 0,
     limit: int = 50,
     db: Session = Depends(get_db)
@@ -188,41 +297,6 @@ async def list_documents(
     List all documents
     """
     doc_service = DocumentService(db)
-    documents = doc_service.list_documents(skip=skip, limit=limit)
-    return [DocumentResponse.from_orm(doc) for doc in documents]
-
-
-async def process_document_background(document_id: int, app_state):
-    """
-    Background task to process document and generate analysis
-    """
-    from app.db.database import SessionLocal
-    
-    db = SessionLocal()
-    try:
-        logger.info(f"Starting background processing for document {document_id}")
-        
-        # Get services from app state
-        ai_service = app_state.ai_service
-        rag_service = app_state.rag_service
-        
-        # Create service instances
-        doc_service = DocumentService(db)
-        analysis_service = AnalysisService(db, ai_service, rag_service)
-        
-        # Update status
-        doc_service.update_status(document_id, DocumentStatus.PROCESSING)
-        
-        # Process document
-        await analysis_service.process_document(document_id)
-        
-        # Update status
-        doc_service.update_status(document_id, DocumentStatus.COMPLETED)
-        
-        logger.info(f"Completed processing for document {document_id}")
-        
-    except Exception as e:
-        logger.error(f"Error processing document {document_id}: {str(e)}", exc_info=True)
-        doc_service.update_status(document_id, DocumentStatus.FAILED, error=str(e))
-    finally:
-        db.close()
+    rows = doc_service.list_documents(skip=skip, limit=limit)
+    documents = document_list_adapter.validate_python(rows)
+    return Response(content=document_list_adapter.dump_json(documents), media_type="application/json")
@@ -0,0 +1,61 @@
+"""
+Short-lived Redis cache for API read responses
+Absorbs UI polling on document/analysis status without hitting the database
+"""
+import logging
+from typing import Optional
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def document_cache_key(document_id: int) -> str:
+    return f"api:document:{document_id}"
+
+
+def analysis_cache_key(document_id: int) -> str:
+    return f"api:analysis:{document_id}"
+
+
+class ResponseCache:
+    """Best-effort cache of serialized responses; Redis errors count as misses"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client: Optional[redis.Redis] = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.from_url(
+                self.url,
+                decode_responses=False,
+                socket_timeout=0.5,
+                socket_connect_timeout=0.5
+            )
+        return self._client
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache get error: {str(e)}")
+            return None
+
+    def set(self, key: str, value: bytes, ttl: int):
+        try:
+            self.client.setex(key, ttl, value)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache set error: {str(e)}")
+
+    def invalidate(self, *keys: str):
+        try:
+            self.client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Response cache invalidate error: {str(e)}")
+
+
+response_cache = ResponseCache(settings.REDIS_URL)
@@ -2,7 +2,8 @@
 Configuration settings for the application
 """
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
+from functools import cached_property
 import os
 from pathlib import Path
 
@@ -26,20 +27,36 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 40
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = False  # Enable if a firewall/proxy drops idle connections
     
     # Redis
     REDIS_URL: str
     REDIS_CACHE_TTL: int = 86400
+    PRICE_LOCAL_CACHE_SIZE: int = 1024  # Per-process hot price entries; 0 disables
+    PRICE_LOCAL_CACHE_TTL: int = 60  # Seconds
+    DOCUMENT_CACHE_TTL: int = 5  # Seconds; status polling endpoint
+    ANALYSIS_CACHE_TTL: int = 30
     
     # AI/ML
     TRANSFORMER_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
     NER_MODEL: str = "en_core_web_lg"
+    NER_USE_PARSER_SENTENCES: bool = False  # True: dependency parser splits sentences
+    INFERENCE_MAX_BATCH: int = 32  # Concurrent model requests coalesced per call
+    INFERENCE_MAX_WAIT_MS: float = 5.0  # How long a batch waits to fill
+    NLP_N_PROCESS: int = 1  # spaCy processes for multi-document batches (CPU only)
+    EMBEDDING_HALF_PRECISION: bool = True  # fp16 on CUDA, bf16 on CPU (PyTorch backend)
+    EMBEDDING_ONNX_ON_CPU: bool = True  # Serve embeddings from ONNX Runtime when no GPU
+    ANALYSIS_CONCURRENCY: int = 8  # Interventions mapped/priced at once per document
+    EMBEDDING_CACHE_SIZE: int = 50000  # Per worker process; ~1.5KB per MiniLM vector
     OPENAI_API_KEY: Optional[str] = None
     OPENAI_MODEL: str = "gpt-4"
     
     # Vector Database
     CHROMA_PERSIST_DIRECTORY: str = "./data/chromadb"
     VECTOR_COLLECTION_NAME: str = "irc_standards"
+    SEMANTIC_CACHE_SIZE: int = 512  # Cached standards lookups per top_k; 0 disables
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9  # Min cosine similarity to reuse a result
     
     # Government Data Sources
     CPWD_SOR_API_URL: str = "https://cpwd.gov.in/api/sor"
@@ -51,13 +68,19 @@ class Settings(BaseSettings):
     MAX_UPLOAD_SIZE_MB: int = 50
     ALLOWED_EXTENSIONS: str = "pdf,docx,txt,png,jpg,jpeg"
     TESSERACT_PATH: str = "/usr/bin/tesseract"
+    OCR_WORKERS: int = 0  # Parallel OCR pages; 0 = one per CPU
+    OCR_DPI: int = 200
+    OCR_RETRY_DPI: int = 300  # Re-OCR pages below OCR_MIN_CONFIDENCE at this DPI
+    OCR_MIN_CONFIDENCE: float = 60.0
     TEMP_UPLOAD_DIR: str = "./data/uploads"
     PROCESSED_DIR: str = "./data/processed"
+    EXTRACTED_TEXT_DB_MAX_CHARS: int = 1_000_000  # Larger texts are kept in PROCESSED_DIR
     
     # Report Generation
     REPORT_OUTPUT_DIR: str = "./data/reports"
     REPORT_TEMPLATE_DIR: str = "./templates/reports"
     LOGO_PATH: str = "./static/assets/emblem.svg"
+    REPORT_X_ACCEL_PREFIX: Optional[str] = None  # e.g. "/_reports/" when served via Nginx
     
     # Security
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
@@ -78,10 +101,10 @@ class Settings(BaseSettings):
     ENABLE_METRICS: bool = True
     METRICS_PORT: int = 9090
     
-    @property
-    def allowed_extensions_list(self) -> List[str]:
-        """Get list of allowed file extensions"""
-        return [ext.strip() for ext in self.ALLOWED_EXTENSIONS.split(",")]
+    @cached_property
+    def allowed_extensions_list(self) -> FrozenSet[str]:
+        """Get set of allowed file extensions (computed once)"""
+        return frozenset(ext.strip() for ext in self.ALLOWED_EXTENSIONS.split(","))
     
     def ensure_directories(self):
         """Ensure all required directories exist"""
@@ -1,15 +1,42 @@
 """
 Logging configuration
 """
+import atexit
 import logging
 import logging.handlers
+import os
+import queue
 from pathlib import Path
+from typing import Optional
 from pythonjsonlogger import jsonlogger
 from app.core.config import settings
 
 
+# Background thread that formats records and writes them to the real handlers
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread
+
+    The stock prepare() formats the record, traceback included, in the
+    calling thread; here only the message is rendered so args can't change
+    underneath us, and exc_info is kept for the JSON formatter.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
 def setup_logging():
     """Setup application logging"""
+    global _queue_listener
+    
+    if _queue_listener is not None:
+        return
     
     # Create logs directory
     log_dir = Path(settings.LOG_FILE).parent
@@ -27,7 +54,6 @@ def setup_logging():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     console_handler.setFormatter(console_formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler with rotation
     file_handler = logging.handlers.RotatingFileHandler(
@@ -43,9 +69,56 @@ def setup_logging():
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(json_formatter)
-    root_logger.addHandler(file_handler)
+    
+    # Callers only enqueue; formatting and disk I/O happen on the listener thread
+    log_queue = queue.Queue(-1)
+    root_logger.addHandler(DeferredQueueHandler(log_queue))
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue,
+        console_handler,
+        file_handler,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
+    atexit.register(shutdown_logging)
+    os.register_at_fork(after_in_child=_restart_listener_in_child)
     
     # Suppress noisy loggers
     logging.getLogger("transformers").setLevel(logging.WARNING)
-    logging.getLogger("chromadb").setLevel(logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _restart_listener_in_child():
+    """Listener threads don't survive fork (Celery prefork pool); start a fresh one"""
+    global _queue_listener
+    
+    if _queue_listener is None:
+        return
+    log_queue = queue.Queue(-1)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DeferredQueueHandler):
+            handler.queue = log_queue
+    _queue_listener = logging.handlers.QueueListener(
+        log_queue,
+        *_queue_listener.handlers,
+        respect_handler_level=True
+    )
+    _queue_listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _queue_listener
+    
+    if _queue_listener is None:
+        return
+    _queue_listener.stop()
+    
+    # Hand the real handlers back to the root logger for anything logged afterwards
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        if isinstance(handler, DeferredQueueHandler):
+            root_logger.removeHandler(handler)
+    for handler in _queue_listener.handlers:
+        root_logger.addHandler(handler)
+    _queue_listener = None
@@ -0,0 +1,50 @@
+"""
+Custom ASGI middleware
+"""
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Payloads that are already compressed; gzipping them burns CPU for no size gain
+INCOMPRESSIBLE_CONTENT_TYPES = (
+    "application/pdf",
+    "application/zip",
+    "application/octet-stream",
+    "image/",
+    "video/",
+    "audio/",
+)
+
+
+class SelectiveGZipResponder(GZipResponder):
+    """GZip responder that passes incompressible responses through untouched"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int = 9) -> None:
+        super().__init__(app, minimum_size, compresslevel=compresslevel)
+        self.passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            self.passthrough = content_type.startswith(INCOMPRESSIBLE_CONTENT_TYPES)
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        await super().send_with_gzip(message)
+
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that skips PDFs, images and other binary payloads"""
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            if "gzip" in headers.get("Accept-Encoding", ""):
+                responder = SelectiveGZipResponder(
+                    self.app, self.minimum_size, compresslevel=self.compresslevel
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -3,7 +3,7 @@ Database configuration and session management
 """
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from typing import Generator
 from app.core.config import settings
 
@@ -12,13 +12,17 @@ engine = create_engine(
     settings.DATABASE_URL,
     pool_size=settings.DATABASE_POOL_SIZE,
     max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    pool_pre_ping=True,
+    pool_pre_ping=settings.DATABASE_POOL_PRE_PING,
+    pool_recycle=settings.DATABASE_POOL_RECYCLE,
     echo=settings.DEBUG
 )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Thread-scoped registry for long-lived workers; call ScopedSession.remove() when a unit of work ends
+ScopedSession = scoped_session(SessionLocal)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -1,13 +1,17 @@
 """
 Database models for the application
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, JSON, ForeignKey, Index, CheckConstraint, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
 from app.db.database import Base
 
+# Binary, indexable JSONB on PostgreSQL; plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 class DocumentStatus(str, enum.Enum):
     """Document processing status"""
@@ -27,7 +31,7 @@ class Document(Base):
     file_path = Column(String(512), nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String(100), nullable=False)
-    status = Column(Enum(DocumentStatus), default=DocumentStatus.UPLOADED, nullable=False)
+    status = Column(String(20), default=DocumentStatus.UPLOADED.value, nullable=False)
     
     # Processing info
     extracted_text = Column(Text, nullable=True)
@@ -44,6 +48,15 @@ class Document(Base):
     # Relationships
     interventions = relationship("Intervention", back_populates="document", cascade="all, delete-orphan")
     analysis = relationship("Analysis", back_populates="document", uselist=False, cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_documents_created_at", "created_at"),
+        Index("ix_documents_status_created", "status", "created_at"),
+        CheckConstraint(
+            "status IN ({})".format(", ".join(f"'{status.value}'" for status in DocumentStatus)),
+            name="ck_doc_status"
+        ),
+    )
 
 
 class Intervention(Base):
@@ -51,7 +64,7 @@ class Intervention(Base):
     __tablename__ = "interventions"
     
     id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Intervention details
     intervention_type = Column(String(200), nullable=False)
@@ -60,11 +73,11 @@ class Intervention(Base):
     chainage = Column(String(100), nullable=True)
     
     # Specifications
-    specifications = Column(JSON, nullable=True)  # Detailed specs as JSON
+    specifications = Column(JSONType, nullable=True)  # Detailed specs as JSON
     
     # IRC standards
-    irc_standards = Column(JSON, nullable=True)  # List of relevant IRC standards
-    irc_clauses = Column(JSON, nullable=True)  # Specific clause references
+    irc_standards = Column(JSONType, nullable=True)  # List of relevant IRC standards
+    irc_clauses = Column(JSONType, nullable=True)  # Specific clause references
     
     # Quantities
     quantity = Column(Float, nullable=True)
@@ -79,6 +92,11 @@ class Intervention(Base):
     # Relationships
     document = relationship("Document", back_populates="interventions")
     cost_items = relationship("CostItem", back_populates="intervention", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_intervention_specs_gin", "specifications", postgresql_using="gin"),
+        Index("ix_intervention_irc_standards_gin", "irc_standards", postgresql_using="gin"),
+    )
 
 
 class CostItem(Base):
@@ -86,7 +104,7 @@ class CostItem(Base):
     __tablename__ = "cost_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    intervention_id = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), nullable=False)
+    intervention_id = Column(Integer, ForeignKey("interventions.id", ondelete="CASCADE"), nullable=False, index=True)
     
     # Material details
     material_name = Column(String(300), nullable=False)
@@ -137,9 +155,9 @@ class Analysis(Base):
     analysis_duration_seconds = Column(Float, nullable=True)
     
     # Additional data
-    summary_data = Column(JSON, nullable=True)
-    assumptions = Column(JSON, nullable=True)
-    warnings = Column(JSON, nullable=True)
+    summary_data = Column(JSONType, nullable=True)
+    assumptions = Column(JSONType, nullable=True)
+    warnings = Column(JSONType, nullable=True)
     
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
@@ -159,7 +177,7 @@ class IRCStandard(Base):
     
     # Content
     full_text = Column(Text, nullable=True)
-    clauses = Column(JSON, nullable=True)  # Structured clause data
+    clauses = Column(JSONType, nullable=True)  # Structured clause data
     
     # Metadata
     version = Column(String(50), nullable=True)
@@ -201,3 +219,10 @@ class PriceCache(Base):
     
     created_at = Column(DateTime, default=func.now(), nullable=False)
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
+    
+    __table_args__ = (
+        # Matches the cache lookup in PricingService._get_cached_prices
+        Index("ix_price_cache_lookup", "material_name", "unit", "valid_until"),
+        # Conflict target for the upsert in PricingService._upsert_cached_prices
+        UniqueConstraint("material_name", "unit", name="uq_price_cache_material_unit"),
+    )
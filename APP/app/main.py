@@ -4,7 +4,6 @@ Main FastAPI application for Road Safety Intervention Analysis System
 from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
@@ -14,11 +13,10 @@ import os
 from pathlib import Path
 
 from app.core.config import settings
-from app.core.logging_config import setup_logging
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.core.middleware import SelectiveGZipMiddleware
 from app.api import routes
 from app.db.database import engine, Base, get_db
-from app.services.ai_service import AIService
-from app.services.rag_service import RAGService
 
 # Setup logging
 setup_logging()
@@ -33,27 +31,15 @@ async def lifespan(app: FastAPI):
     # Create database tables
     Base.metadata.create_all(bind=engine)
     
-    # Initialize AI services
-    logger.info("Initializing AI services...")
-    ai_service = AIService()
-    await ai_service.initialize()
-    
-    rag_service = RAGService()
-    await rag_service.initialize()
-    
-    # Store in app state
-    app.state.ai_service = ai_service
-    app.state.rag_service = rag_service
-    
+    # AI services are loaded by the Celery analysis workers (app.tasks)
     logger.info("Application startup complete")
     
     yield
     
     # Cleanup
     logger.info("Shutting down application...")
-    await ai_service.cleanup()
-    await rag_service.cleanup()
     logger.info("Application shutdown complete")
+    shutdown_logging()
 
 
 # Create FastAPI application
@@ -75,7 +61,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(SelectiveGZipMiddleware, minimum_size=1000)
 
 if not settings.DEBUG:
     app.add_middleware(
@@ -133,5 +119,7 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
-        workers=1 if settings.DEBUG else settings.WORKERS
+        workers=1 if settings.DEBUG else settings.WORKERS,
+        loop="uvloop",
+        http="httptools"
     )
@@ -1,7 +1,7 @@
 """
 Pydantic schemas for API requests and responses
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
@@ -36,8 +36,7 @@ class DocumentResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 class InterventionResponse(BaseModel):
@@ -54,8 +53,7 @@ class InterventionResponse(BaseModel):
     unit: Optional[str] = None
     confidence_score: Optional[float] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 class CostItemResponse(BaseModel):
@@ -72,8 +70,7 @@ class CostItemResponse(BaseModel):
     price_source_reference: Optional[str] = None
     price_fetched_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
 
 
 class AnalysisResponse(BaseModel):
@@ -92,5 +89,4 @@ class AnalysisResponse(BaseModel):
     assumptions: Optional[List[str]] = None
     warnings: Optional[List[str]] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
@@ -2,19 +2,90 @@
 AI Service for NLP and intervention extraction
 Combines spaCy NER with transformer models
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from hashlib import blake2b
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+import ahocorasick
+import numpy as np
 import spacy
 import torch
 from transformers import pipeline, AutoTokenizer, AutoModel
 from sentence_transformers import SentenceTransformer
-import re
+import re2
 import json
 
 from app.core.config import settings
+from app.utils.batching import MicroBatcher
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc, Span
 
 logger = logging.getLogger(__name__)
 
+# Only sentence boundaries and NER are used; the rest of the pipeline is never loaded
+UNUSED_PIPES = ["tagger", "attribute_ruler", "lemmatizer"]
+
+# Token limit used by the sentence-transformers config of the default MiniLM model
+EMBEDDING_MAX_SEQ_LENGTH = 256
+
+# Entity labels treated as an intervention location
+LOCATION_LABELS = frozenset({'GPE', 'LOC', 'FAC'})
+
+# Intervention categories, checked in order; first category with a matching keyword wins
+INTERVENTION_CATEGORIES = {
+    'Safety Barrier': ['guardrail', 'crash barrier', 'safety barrier', 'parapet', 'railing'],
+    'Traffic Calming': ['rumble strip', 'speed bump', 'road hump', 'speed table'],
+    'Signage': ['traffic sign', 'signage', 'warning sign', 'mandatory sign', 'guide sign', 'information board'],
+    'Road Marking': ['road marking', 'pavement marking', 'line marking'],
+    'Pedestrian Facility': ['pedestrian crossing', 'footpath', 'footway', 'sidewalk', 'zebra crossing'],
+    'Illumination': ['street light', 'road light', 'illumination', 'lighting'],
+    'Delineation': ['delineator', 'chevron', 'road stud', 'cat eye', 'reflector'],
+    'Drainage': ['drainage', 'culvert', 'catch pit', 'gutter'],
+    'Junction Improvement': ['roundabout', 'junction', 'intersection'],
+    'Road Furniture': ['milestone', 'km stone', 'cattle guard'],
+}
+
+# One alternation per category; plain substring semantics, so plurals still match
+CATEGORY_RES = [
+    (category, re2.compile("|".join(re2.escape(kw) for kw in keywords)))
+    for category, keywords in INTERVENTION_CATEGORIES.items()
+]
+
+# Python's str.isspace() set; RE2's \s alone is only [\t\n\f\r ]
+_UNICODE_SPACE = r"\s\v\x1c-\x1f\x85\p{Z}"
+
+
+def _unicode_classes(pattern: str) -> str:
+    """
+    Rewrite \\d and \\s for RE2 so they match Unicode like Python's re
+
+    RE2's shorthand classes are ASCII-only; DPRs can contain Devanagari digits
+    and non-breaking spaces, which float() and the old re patterns accepted.
+    """
+    out = []
+    in_class = False
+    chars = iter(pattern)
+    for char in chars:
+        if char == "\\":
+            escaped = next(chars)
+            if escaped == "d":
+                out.append(r"\p{Nd}")
+            elif escaped == "s":
+                out.append(_UNICODE_SPACE if in_class else f"[{_UNICODE_SPACE}]")
+            else:
+                out.append(char + escaped)
+            continue
+        if char == "[":
+            in_class = True
+        elif char == "]":
+            in_class = False
+        out.append(char)
+    return "".join(out)
+
 
 class AIService:
     """AI service for document analysis and entity extraction"""
@@ -24,6 +95,31 @@ class AIService:
         self.transformer_model = None
         self.ner_pipeline = None
         self.embedding_model = None
+        self._keyword_automaton = None
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        
+        # ONNX Runtime encoder used instead of embedding_model on CPU
+        self.ort_model = None
+        self.ort_tokenizer = None
+        
+        # Single inference thread: models stay off the event loop and are never
+        # entered concurrently, so calls queue up in submission order
+        self._inference_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference")
+        
+        # Concurrent single-document/-text requests are coalesced into batched model calls
+        self._parse_batcher = MicroBatcher(
+            self._parse_batch,
+            max_batch=settings.INFERENCE_MAX_BATCH,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS
+        )
+        self._embed_batcher = MicroBatcher(
+            self._encode_batch,
+            max_batch=settings.INFERENCE_MAX_BATCH,
+            max_wait_ms=settings.INFERENCE_MAX_WAIT_MS
+        )
+        
+        # Embeddings keyed by model + normalized text hash, least recently used evicted first
+        self._emb_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
         
         # Intervention patterns
         self.intervention_keywords = [
@@ -55,29 +151,134 @@ class AIService:
             r'IRC[:\s]*SP[:\s-]*(\d+)',
             r'Indian\s+Roads\s+Congress[:\s]+(\d+)',
         ]
+        
+        # Specification patterns, keyed by spec name
+        self.spec_patterns = {
+            'material': r'(?:made of|material|using)\s+([a-zA-Z\s]+?)(?:\s|,|\.)',
+            'grade': r'grade[:\s]+([A-Z0-9]+)',
+            'class': r'class[:\s]+([A-Z0-9]+)',
+            'type': r'type[:\s]+([A-Z0-9\s]+?)(?:\s|,|\.)',
+            'thickness': r'thickness[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
+            'diameter': r'diameter[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
+            'height': r'height[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
+            'width': r'width[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
+        }
+        
+        # Compiled once with RE2 (linear-time, no backtracking); these run for every
+        # sentence of every document. RE2 takes flags inline, hence the (?i) prefix.
+        self._quantity_res = [re2.compile(_unicode_classes(f"(?i){p}")) for p in self.quantity_patterns]
+        self._spec_res = {
+            name: re2.compile(_unicode_classes(f"(?i){p}")) for name, p in self.spec_patterns.items()
+        }
+        self._chainage_re = re2.compile(
+            _unicode_classes(r'(?:km|chainage|ch\.?)[:\s]*(\d+(?:\.\d+)?)[+\s]*(\d+)?')
+        )
+        # IRC patterns never match at the same offset, so one alternation finds them all
+        self._irc_re = re2.compile(_unicode_classes(
+            "(?i)" + "|".join(f"(?P<irc{i}>{p})" for i, p in enumerate(self.irc_patterns))
+        ))
+        self._irc_group_index = self._build_group_index(self._irc_re, len(self.irc_patterns), "irc")
+    
+    @staticmethod
+    def _build_group_index(pattern: "re2._Regexp", count: int, prefix: str) -> List[Tuple[int, int]]:
+        """Map each named alternative to the span of its inner group numbers"""
+        spans = []
+        for i in range(count):
+            start = pattern.groupindex[f"{prefix}{i}"] + 1
+            end = pattern.groupindex[f"{prefix}{i + 1}"] if i + 1 < count else pattern.groups + 1
+            spans.append((start, end))
+        return spans
     
     async def initialize(self):
         """Initialize AI models"""
         try:
             logger.info("Loading spaCy model...")
-            self.nlp = spacy.load(settings.NER_MODEL)
+            if self.device == "cuda":
+                spacy.prefer_gpu()
+            if settings.NER_USE_PARSER_SENTENCES:
+                self.nlp = spacy.load(settings.NER_MODEL, exclude=UNUSED_PIPES)
+            else:
+                # Rule-based sentencizer is far cheaper than the dependency parser
+                self.nlp = spacy.load(settings.NER_MODEL, exclude=UNUSED_PIPES + ["parser"])
+                self.nlp.add_pipe("sentencizer", first=True)
+            logger.info(f"spaCy pipeline: {self.nlp.pipe_names}")
             
             logger.info("Loading embedding model...")
-            self.embedding_model = SentenceTransformer(settings.TRANSFORMER_MODEL)
+            if self.device == "cpu" and settings.EMBEDDING_ONNX_ON_CPU:
+                self._load_onnx_encoder()
+            else:
+                self.embedding_model = SentenceTransformer(settings.TRANSFORMER_MODEL, device=self.device)
+                if settings.EMBEDDING_HALF_PRECISION:
+                    self._reduce_embedding_precision()
+            
+            self._keyword_automaton = self._build_keyword_automaton()
             
-            logger.info("AI models loaded successfully")
+            logger.info(f"AI models loaded successfully on {self.device}")
         
         except Exception as e:
             logger.error(f"Error initializing AI models: {str(e)}", exc_info=True)
             raise
     
+    def _load_onnx_encoder(self):
+        """Export the embedding encoder to ONNX and run it on ONNX Runtime's CPU kernels"""
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        
+        self.ort_tokenizer = AutoTokenizer.from_pretrained(settings.TRANSFORMER_MODEL)
+        self.ort_model = ORTModelForFeatureExtraction.from_pretrained(
+            settings.TRANSFORMER_MODEL,
+            export=True,
+            provider="CPUExecutionProvider"
+        )
+        logger.info("Embedding model exported to ONNX Runtime")
+    
+    def _reduce_embedding_precision(self):
+        """Halve embedding weight width; accuracy loss is negligible for similarity search"""
+        if self.device == "cuda":
+            self.embedding_model.half()
+        else:
+            self.embedding_model.to(dtype=torch.bfloat16)
+        logger.info(f"Embedding model running in {next(self.embedding_model.parameters()).dtype}")
+    
+    def _build_keyword_automaton(self) -> "ahocorasick.Automaton":
+        """Aho-Corasick automaton over intervention keywords; values keep list order"""
+        automaton = ahocorasick.Automaton()
+        for idx, keyword in enumerate(self.intervention_keywords):
+            automaton.add_word(keyword, (idx, keyword))
+        automaton.make_automaton()
+        return automaton
+    
+    def _match_keywords(self, text_lower: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+        """All intervention keywords occurring in text[start:end], in one linear pass"""
+        if end is None:
+            end = len(text_lower)
+        matched = {value for _, value in self._keyword_automaton.iter(text_lower, start, end)}
+        return [keyword for _, keyword in sorted(matched)]
+    
+    async def _run_model(self, func, *args, **kwargs):
+        """Run a blocking model call on the inference thread"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._inference_executor, partial(func, *args, **kwargs))
+    
+    async def _parse_batch(self, texts: List[str]) -> List["Doc"]:
+        return await self._run_model(lambda: list(self.nlp.pipe(texts, batch_size=len(texts))))
+    
+    async def _encode_batch(self, texts: List[str]) -> List[np.ndarray]:
+        return list(await self._run_model(self._encode, texts))
+    
     async def cleanup(self):
         """Cleanup resources"""
+        await self._parse_batcher.close()
+        await self._embed_batcher.close()
+        
         # Clear models from memory
         self.nlp = None
         self.transformer_model = None
         self.ner_pipeline = None
         self.embedding_model = None
+        self.ort_model = None
+        self.ort_tokenizer = None
+        self._keyword_automaton = None
+        self._emb_cache.clear()
         
         if torch.cuda.is_available():
             torch.cuda.empty_cache()
@@ -86,24 +287,53 @@ class AIService:
         """
         Extract road safety interventions from text using hybrid NLP approach
         """
-        interventions = []
+        # Process with spaCy, batched with any other documents being parsed right now
+        doc = await self._parse_batcher.submit(text)
+        return await self._extract_interventions_from_doc(doc)
+    
+    async def extract_interventions_batch(
+        self,
+        texts: List[str],
+        n_process: int = 1,
+        batch_size: int = 64
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Extract interventions from several documents, parsing them in one spaCy batch
         
-        # Process with spaCy
-        doc = self.nlp(text)
+        ``n_process`` > 1 forks spaCy worker processes (CPU pipelines only).
+        """
+        docs = await self._run_model(
+            lambda: list(self.nlp.pipe(texts, n_process=n_process, batch_size=batch_size))
+        )
+        results = []
+        for doc in docs:
+            results.append(await self._extract_interventions_from_doc(doc))
+        return results
+    
+    async def _extract_interventions_from_doc(self, doc: "Doc") -> List[Dict[str, Any]]:
+        """Find interventions in an already parsed document"""
+        interventions = []
         
         # Split into sentences
-        sentences = [sent.text.strip() for sent in doc.sents]
+        sents = list(doc.sents)
+        
+        # Lowercase once and scan sentences by char offset; only valid while
+        # lower() keeps every offset in place (true for all but a few code points)
+        text_lower = doc.text.lower()
+        offsets_valid = len(text_lower) == len(doc.text)
         
-        for i, sentence in enumerate(sentences):
+        for i, sent in enumerate(sents):
             # Check if sentence contains intervention keywords
-            sentence_lower = sentence.lower()
-            matched_keywords = [kw for kw in self.intervention_keywords if kw in sentence_lower]
+            if offsets_valid:
+                matched_keywords = self._match_keywords(text_lower, sent.start_char, sent.end_char)
+            else:
+                matched_keywords = self._match_keywords(sent.text.lower())
             
             if matched_keywords:
                 intervention = await self._extract_intervention_details(
-                    sentence, 
+                    sent,
                     matched_keywords,
-                    context_sentences=sentences[max(0, i-1):min(len(sentences), i+2)]
+                    context_sents=sents[max(0, i-1):min(len(sents), i+2)]
                 )
                 if intervention:
                     interventions.append(intervention)
@@ -115,29 +345,29 @@ class AIService:
     
     async def _extract_intervention_details(
         self, 
-        sentence: str, 
+        sent: "Span", 
         keywords: List[str],
-        context_sentences: List[str] = None
+        context_sents: List["Span"]
     ) -> Optional[Dict[str, Any]]:
         """Extract detailed information about an intervention"""
+        sentence = sent.text.strip()
         
         # Combine context
-        full_text = sentence
-        if context_sentences:
-            full_text = " ".join(context_sentences)
-        
-        # Extract entities with spaCy
-        doc = self.nlp(full_text)
-        
-        # Extract locations
-        locations = [ent.text for ent in doc.ents if ent.label_ in ['GPE', 'LOC', 'FAC']]
+        full_text = " ".join(context.text.strip() for context in context_sents)
+        
+        # Extract locations from the entities already found in the parsed document
+        locations = [
+            ent.text
+            for context in context_sents
+            for ent in context.ents
+            if ent.label_ in LOCATION_LABELS
+        ]
         
         # Extract chainages
-        chainage_pattern = r'(?:km|chainage|ch\.?)[:\s]*(\d+(?:\.\d+)?)[+\s]*(\d+)?'
-        chainages = re.findall(chainage_pattern, sentence.lower())
+        chainage = self._chainage_re.search(sentence.lower())
         chainage_str = None
-        if chainages:
-            km, plus = chainages[0]
+        if chainage:
+            km, plus = chainage.groups()
             chainage_str = f"Km {km}" + (f"+{plus}" if plus else "")
         
         # Extract quantities
@@ -170,22 +400,8 @@ class AIService:
         """Classify the type of intervention"""
         text_lower = text.lower()
         
-        # Category mapping
-        categories = {
-            'Safety Barrier': ['guardrail', 'crash barrier', 'safety barrier', 'parapet', 'railing'],
-            'Traffic Calming': ['rumble strip', 'speed bump', 'road hump', 'speed table'],
-            'Signage': ['traffic sign', 'signage', 'warning sign', 'mandatory sign', 'guide sign', 'information board'],
-            'Road Marking': ['road marking', 'pavement marking', 'line marking'],
-            'Pedestrian Facility': ['pedestrian crossing', 'footpath', 'footway', 'sidewalk', 'zebra crossing'],
-            'Illumination': ['street light', 'road light', 'illumination', 'lighting'],
-            'Delineation': ['delineator', 'chevron', 'road stud', 'cat eye', 'reflector'],
-            'Drainage': ['drainage', 'culvert', 'catch pit', 'gutter'],
-            'Junction Improvement': ['roundabout', 'junction', 'intersection'],
-            'Road Furniture': ['milestone', 'km stone', 'cattle guard'],
-        }
-        
-        for category, category_keywords in categories.items():
-            if any(kw in text_lower for kw in category_keywords):
+        for category, pattern in CATEGORY_RES:
+            if pattern.search(text_lower):
                 return category
         
         # Default
@@ -195,26 +411,28 @@ class AIService:
         """Extract quantities and units from text"""
         quantities = []
         
-        for pattern in self.quantity_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    if len(match) == 2:
-                        value, unit = match
-                        quantities.append({
-                            'value': float(value),
-                            'unit': unit.lower().strip(),
-                            'raw_text': f"{value} {unit}"
-                        })
-                    elif len(match) == 3:
-                        # e.g., "10 x 20 m"
-                        val1, val2, unit = match
-                        quantities.append({
-                            'value': float(val1) * float(val2),
-                            'unit': unit.lower().strip(),
-                            'raw_text': f"{val1} x {val2} {unit}",
-                            'dimensions': [float(val1), float(val2)]
-                        })
+        # Patterns are scanned separately: their matches overlap ("length: 120 m" also
+        # matches the generic pattern) and downstream code relies on this ordering
+        for pattern in self._quantity_res:
+            if pattern.groups == 2:
+                for match in pattern.finditer(text):
+                    value, unit = match.groups()
+                    quantities.append({
+                        'value': float(value),
+                        'unit': unit.lower().strip(),
+                        'raw_text': f"{value} {unit}"
+                    })
+            elif pattern.groups == 3:
+                # e.g., "10 x 20 m"
+                for match in pattern.finditer(text):
+                    val1, val2, unit = match.groups()
+                    length, width = float(val1), float(val2)
+                    quantities.append({
+                        'value': length * width,
+                        'unit': unit.lower().strip(),
+                        'raw_text': f"{val1} x {val2} {unit}",
+                        'dimensions': [length, width]
+                    })
         
         return quantities
     
@@ -222,25 +440,14 @@ class AIService:
         """Extract technical specifications"""
         specs = {}
         
-        # Common specification patterns
-        spec_patterns = {
-            'material': r'(?:made of|material|using)\s+([a-zA-Z\s]+?)(?:\s|,|\.)',
-            'grade': r'grade[:\s]+([A-Z0-9]+)',
-            'class': r'class[:\s]+([A-Z0-9]+)',
-            'type': r'type[:\s]+([A-Z0-9\s]+?)(?:\s|,|\.)',
-            'thickness': r'thickness[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
-            'diameter': r'diameter[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
-            'height': r'height[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
-            'width': r'width[:\s]+(\d+(?:\.\d+)?)\s*(mm|cm|m)',
-        }
-        
-        for spec_name, pattern in spec_patterns.items():
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                if isinstance(matches[0], tuple):
-                    specs[spec_name] = ' '.join(matches[0])
+        # Only the first match of each pattern is used, so stop scanning there
+        for spec_name, pattern in self._spec_res.items():
+            match = pattern.search(text)
+            if match:
+                if pattern.groups > 1:
+                    specs[spec_name] = ' '.join(match.groups())
                 else:
-                    specs[spec_name] = matches[0].strip()
+                    specs[spec_name] = match.group(1).strip()
         
         return specs
     
@@ -272,45 +479,109 @@ class AIService:
         if not interventions:
             return []
         
-        # Simple deduplication based on intervention type and location
-        unique = []
-        seen = set()
-        
+        # Deduplicate on type, location and chainage; first occurrence wins
+        unique = {}
         for intervention in interventions:
-            key = (
-                intervention['intervention_type'],
-                intervention.get('location'),
-                intervention.get('chainage')
+            unique.setdefault(
+                (
+                    intervention['intervention_type'],
+                    intervention.get('location'),
+                    intervention.get('chainage')
+                ),
+                intervention
             )
-            if key not in seen:
-                seen.add(key)
-                unique.append(intervention)
         
-        return unique
+        return list(unique.values())
     
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings for texts"""
         if not texts:
             return []
         
-        embeddings = self.embedding_model.encode(texts, convert_to_numpy=True)
-        return embeddings.tolist()
+        # Collapse duplicates first; the model and cache only ever see unique texts
+        slots: Dict[bytes, int] = {}
+        first_index: List[int] = []
+        inverse = np.empty(len(texts), dtype=np.intp)
+        for i, text in enumerate(texts):
+            key = self._embedding_key(text)
+            slot = slots.setdefault(key, len(slots))
+            if slot == len(first_index):
+                first_index.append(i)
+            inverse[i] = slot
+        
+        unique_keys = list(slots)
+        vectors: List[Optional[np.ndarray]] = [self._emb_cache.get(key) for key in unique_keys]
+        for key, vector in zip(unique_keys, vectors):
+            if vector is not None:
+                self._emb_cache.move_to_end(key)
+        
+        missing = [slot for slot, vector in enumerate(vectors) if vector is None]
+        if missing:
+            encoded = await asyncio.gather(*[
+                self._embed_batcher.submit(texts[first_index[slot]]) for slot in missing
+            ])
+            for slot, vector in zip(missing, encoded):
+                vectors[slot] = vector
+            if settings.EMBEDDING_CACHE_SIZE > 0:
+                for slot in missing:
+                    self._emb_cache[unique_keys[slot]] = vectors[slot]
+                while len(self._emb_cache) > settings.EMBEDDING_CACHE_SIZE:
+                    self._emb_cache.popitem(last=False)
+        
+        # Scatter unique rows back to input order
+        return np.stack(vectors)[inverse].tolist()
+    
+    @staticmethod
+    def _embedding_key(text: str) -> bytes:
+        """Cache key; includes the model name so switching models never serves stale vectors"""
+        normalized = f"{settings.TRANSFORMER_MODEL}\0{text.strip().lower()}"
+        return blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+    
+    def _encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """L2-normalized float32 embeddings, one row per text"""
+        if self.ort_model is None:
+            # Tensor output: numpy has no bfloat16, so upcast before leaving torch
+            embeddings = self.embedding_model.encode(
+                texts,
+                device=self.device,
+                batch_size=batch_size,
+                convert_to_tensor=True,
+                normalize_embeddings=True
+            )
+            return embeddings.float().cpu().numpy()
+        
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.ort_tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=EMBEDDING_MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            hidden = self.ort_model(**inputs).last_hidden_state
+            
+            # Mean-pool over real tokens, as the sentence-transformers pooling layer does
+            mask = inputs["attention_mask"][..., np.newaxis].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            batches.append(pooled.astype(np.float32))
+        return np.vstack(batches)
     
     async def find_irc_standards(self, text: str) -> List[str]:
         """Extract IRC standard references from text"""
         standards = set()
         
-        for pattern in self.irc_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                if isinstance(match, tuple):
-                    standard_num = match[0]
-                    year = match[1] if len(match) > 1 else ''
-                    std = f"IRC {standard_num}"
-                    if year:
-                        std += f":{year}"
-                    standards.add(std)
-                else:
-                    standards.add(f"IRC {match}")
+        for match in self._irc_re.finditer(text):
+            start, end = self._irc_group_index[int(match.lastgroup[3:])]
+            groups = [match.group(g) or '' for g in range(start, end)]
+            if len(groups) > 1:
+                standard_num, year = groups[0], groups[1]
+                std = f"IRC {standard_num}"
+                if year:
+                    std += f":{year}"
+                standards.add(std)
+            else:
+                standards.add(f"IRC {groups[0]}")
         
         return list(standards)
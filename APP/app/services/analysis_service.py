@@ -2,19 +2,25 @@
 Analysis service - orchestrates document processing, intervention extraction,
 IRC mapping, pricing, and cost calculation
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
 from datetime import datetime
 from pathlib import Path
 
-from app.db.models import Intervention, CostItem, Analysis
-from app.services.extractor_service import DocumentExtractor
-from app.services.ai_service import AIService
-from app.services.rag_service import RAGService
-from app.services.pricing_service import PricingService
+from app.core.config import settings
+from app.db.models import Document, Intervention, CostItem, Analysis
 from app.services.document_service import DocumentService
-from app.services.report_service import ReportService
+
+if TYPE_CHECKING:
+    from app.services.ai_service import AIService
+    from app.services.extractor_service import DocumentExtractor
+    from app.services.pricing_service import PricingService
+    from app.services.rag_service import RAGService
+    from app.services.report_service import ReportService
 
 logger = logging.getLogger(__name__)
 
@@ -25,16 +31,31 @@ class AnalysisService:
     def __init__(
         self, 
         db: Session,
-        ai_service: Optional[AIService] = None,
-        rag_service: Optional[RAGService] = None
+        ai_service: Optional["AIService"] = None,
+        rag_service: Optional["RAGService"] = None
     ):
         self.db = db
         self.ai_service = ai_service
         self.rag_service = rag_service
-        self.extractor = DocumentExtractor()
-        self.pricing_service = PricingService(db)
         self.doc_service = DocumentService(db)
-        self.report_service = ReportService()
+    
+    # Pipeline helpers pull in OCR/PDF/pricing dependencies, so they are only
+    # imported and built when a document is actually processed. Read-only API
+    # callers (get_analysis) never pay for them.
+    @cached_property
+    def extractor(self) -> "DocumentExtractor":
+        from app.services.extractor_service import DocumentExtractor
+        return DocumentExtractor()
+    
+    @cached_property
+    def pricing_service(self) -> "PricingService":
+        from app.services.pricing_service import PricingService
+        return PricingService(self.db)
+    
+    @cached_property
+    def report_service(self) -> "ReportService":
+        from app.services.report_service import ReportService
+        return ReportService()
     
     async def process_document(self, document_id: int):
         """
@@ -44,127 +65,255 @@ class AnalysisService:
         
         try:
             logger.info(f"Starting analysis for document {document_id}")
+            document, analysis, text = await self._prepare_document(document_id, start_time)
             
-            # Get document
-            document = self.doc_service.get_document(document_id)
-            if not document:
-                raise ValueError(f"Document {document_id} not found")
-            
-            # Create analysis record
-            analysis = Analysis(
-                document_id=document_id,
-                analysis_started_at=start_time
-            )
-            self.db.add(analysis)
-            self.db.commit()
-            
-            # Step 1: Extract text
-            logger.info("Step 1: Extracting text from document")
-            text = await self.extractor.extract_text(document.file_path)
-            self.doc_service.update_extracted_text(document_id, text)
-            
-            if not text or len(text.strip()) < 50:
-                raise ValueError("Insufficient text extracted from document")
-            
-            # Step 2: Extract interventions using AI
-            logger.info("Step 2: Extracting interventions using AI/NLP")
-            interventions = await self.ai_service.extract_interventions(text)
-            logger.info(f"Found {len(interventions)} interventions")
-            
-            if not interventions:
-                raise ValueError("No interventions found in document")
-            
-            # Step 3: Process each intervention
-            total_cost = 0.0
-            assumptions = []
-            warnings = []
-            
-            for idx, intervention_data in enumerate(interventions):
-                logger.info(f"Processing intervention {idx+1}/{len(interventions)}: {intervention_data['intervention_type']}")
-                
-                # Find relevant IRC standards
-                irc_standards = await self.rag_service.find_relevant_standards(intervention_data)
-                irc_codes = [std['code'] for std in irc_standards]
-                irc_clauses = []
-                for std in irc_standards:
-                    if std.get('matched_clause'):
-                        irc_clauses.append(f"{std['code']} - Clause {std['matched_clause']}")
-                
-                # Create intervention record
-                intervention = Intervention(
-                    document_id=document_id,
-                    intervention_type=intervention_data['intervention_type'],
-                    description=intervention_data['description'],
-                    location=intervention_data.get('location'),
-                    chainage=intervention_data.get('chainage'),
-                    specifications=intervention_data.get('specifications'),
-                    irc_standards=irc_codes,
-                    irc_clauses=irc_clauses,
-                    confidence_score=intervention_data.get('confidence_score'),
-                    extraction_method=intervention_data.get('extraction_method')
-                )
-                self.db.add(intervention)
-                self.db.flush()  # Get intervention ID
-                
-                # Step 4: Calculate costs
-                cost_data = await self._calculate_intervention_cost(
-                    intervention_data,
-                    intervention.id
-                )
-                
-                if cost_data:
-                    total_cost += cost_data['total_cost']
-                    assumptions.extend(cost_data.get('assumptions', []))
-                    warnings.extend(cost_data.get('warnings', []))
-            
-            # Update analysis record prior to report generation
-            analysis.analysis_completed_at = datetime.now()
-            analysis.analysis_duration_seconds = (
-                analysis.analysis_completed_at - start_time
-            ).total_seconds()
-            analysis.total_interventions = len(interventions)
-            analysis.total_cost = total_cost
-            analysis.assumptions = assumptions
-            analysis.warnings = warnings
-            analysis.summary_data = {
-                'interventions_by_type': self._summarize_by_type(interventions),
-                'total_interventions': len(interventions),
-                'total_cost': total_cost
-            }
-
-            # Step 5: Generate report with enriched analysis data
-            logger.info("Step 5: Generating report")
-            report_path = await self.report_service.generate_report(
-                document_id=document_id,
-                document=document,
-                interventions=self.db.query(Intervention).filter(
-                    Intervention.document_id == document_id
-                ).all(),
-                total_cost=total_cost,
-                analysis=analysis
+            # Step 2: Extract interventions using AI, storing the text meanwhile.
+            # run_in_executor submits immediately, so the write overlaps the CPU-bound NER;
+            # nothing else touches the session until it has finished.
+            save_text = asyncio.get_running_loop().run_in_executor(
+                None, self.doc_service.update_extracted_text, document_id, text
             )
-            analysis.report_path = report_path
-            analysis.report_generated_at = datetime.now()
-            
-            self.db.commit()
+            try:
+                logger.info("Step 2: Extracting interventions using AI/NLP")
+                interventions = await self.ai_service.extract_interventions(text)
+            finally:
+                await save_text
             
-            logger.info(f"Analysis completed for document {document_id}. Total cost: ₹{total_cost:,.2f}")
+            await self._complete_analysis(document, analysis, interventions, start_time)
             
         except Exception as e:
             logger.error(f"Error processing document {document_id}: {str(e)}", exc_info=True)
             self.db.rollback()
             raise
     
+    async def process_documents(self, document_ids: List[int]) -> Dict[int, str]:
+        """
+        Process several documents, running spaCy over all their texts in one batch
+        
+        Returns error messages keyed by document id for the documents that failed.
+        """
+        errors: Dict[int, str] = {}
+        prepared = []
+        
+        for document_id in document_ids:
+            start_time = datetime.now()
+            try:
+                logger.info(f"Starting analysis for document {document_id}")
+                document, analysis, text = await self._prepare_document(document_id, start_time)
+                prepared.append((document_id, start_time, document, analysis, text))
+            except Exception as e:
+                logger.error(f"Error processing document {document_id}: {str(e)}", exc_info=True)
+                self.db.rollback()
+                errors[document_id] = str(e)
+        
+        if not prepared:
+            return errors
+        
+        # Step 2: Extract interventions for every document in one spaCy batch
+        logger.info(f"Step 2: Extracting interventions from {len(prepared)} documents")
+        n_process = settings.NLP_N_PROCESS if self.ai_service.device == "cpu" else 1
+        try:
+            save_texts = asyncio.get_running_loop().run_in_executor(
+                None, self._save_extracted_texts, [(item[0], item[4]) for item in prepared]
+            )
+            try:
+                batches = await self.ai_service.extract_interventions_batch(
+                    [text for *_, text in prepared],
+                    n_process=n_process
+                )
+            finally:
+                await save_texts
+        except Exception as e:
+            # The shared pass failed, so every prepared document fails with it
+            logger.error(f"Error extracting interventions for batch: {str(e)}", exc_info=True)
+            self.db.rollback()
+            for document_id, *_ in prepared:
+                errors[document_id] = str(e)
+            return errors
+        
+        for (document_id, start_time, document, analysis, _), interventions in zip(prepared, batches):
+            try:
+                await self._complete_analysis(document, analysis, interventions, start_time)
+            except Exception as e:
+                logger.error(f"Error processing document {document_id}: {str(e)}", exc_info=True)
+                self.db.rollback()
+                errors[document_id] = str(e)
+        
+        return errors
+    
+    async def _prepare_document(
+        self,
+        document_id: int,
+        start_time: datetime
+    ) -> Tuple[Document, Analysis, str]:
+        """Create the analysis record and extract the document's text"""
+        # Get document
+        document = self.doc_service.get_document(document_id)
+        if not document:
+            raise ValueError(f"Document {document_id} not found")
+        
+        # Create analysis record
+        analysis = Analysis(
+            document_id=document_id,
+            analysis_started_at=start_time
+        )
+        self.db.add(analysis)
+        self.db.commit()
+        
+        # Step 1: Extract text
+        logger.info("Step 1: Extracting text from document")
+        text = await self.extractor.extract_text(document.file_path)
+        
+        if not text or len(text.strip()) < 50:
+            self.doc_service.update_extracted_text(document_id, text)
+            raise ValueError("Insufficient text extracted from document")
+        
+        # Callers store the text while NER runs
+        return document, analysis, text
+    
+    def _save_extracted_texts(self, texts: List[Tuple[int, str]]):
+        """Store extracted texts one after another (the session is not thread-safe)"""
+        for document_id, text in texts:
+            self.doc_service.update_extracted_text(document_id, text)
+    
+    async def _complete_analysis(
+        self,
+        document: Document,
+        analysis: Analysis,
+        interventions: List[Dict[str, Any]],
+        start_time: datetime
+    ):
+        """Map, price, store and report the interventions found in a document"""
+        document_id = document.id
+        logger.info(f"Found {len(interventions)} interventions")
+        
+        if not interventions:
+            raise ValueError("No interventions found in document")
+        
+        # Step 3: Process interventions concurrently (RAG lookups and pricing are I/O bound)
+        semaphore = asyncio.Semaphore(settings.ANALYSIS_CONCURRENCY)
+        
+        async def process_bounded(idx: int, intervention_data: Dict):
+            async with semaphore:
+                return await self._process_intervention(
+                    document_id, idx, len(interventions), intervention_data
+                )
+        
+        results = await asyncio.gather(*[
+            process_bounded(idx, intervention_data)
+            for idx, intervention_data in enumerate(interventions)
+        ])
+        
+        # Aggregate in document order
+        total_cost = 0.0
+        assumptions = []
+        warnings = []
+        intervention_rows = []
+        cost_rows_by_intervention = []
+        for intervention_row, cost_data in results:
+            intervention_rows.append(intervention_row)
+            if cost_data:
+                total_cost += cost_data['total_cost']
+                assumptions.extend(cost_data.get('assumptions', []))
+                warnings.extend(cost_data.get('warnings', []))
+                cost_rows_by_intervention.append(cost_data['cost_items'])
+            else:
+                cost_rows_by_intervention.append([])
+        
+        # Insert interventions, then their cost items, in two batched statements
+        intervention_ids = self.db.scalars(
+            insert(Intervention).returning(Intervention.id, sort_by_parameter_order=True),
+            intervention_rows
+        ).all()
+        cost_rows = []
+        for intervention_id, item_rows in zip(intervention_ids, cost_rows_by_intervention):
+            for item_row in item_rows:
+                item_row['intervention_id'] = intervention_id
+                cost_rows.append(item_row)
+        if cost_rows:
+            self.db.execute(insert(CostItem), cost_rows)
+        
+        # Update analysis record prior to report generation
+        analysis.analysis_completed_at = datetime.now()
+        analysis.analysis_duration_seconds = (
+            analysis.analysis_completed_at - start_time
+        ).total_seconds()
+        analysis.total_interventions = len(interventions)
+        analysis.total_cost = total_cost
+        analysis.assumptions = assumptions
+        analysis.warnings = warnings
+        analysis.summary_data = {
+            'interventions_by_type': self._summarize_by_type(interventions),
+            'total_interventions': len(interventions),
+            'total_cost': total_cost
+        }
+
+        # Step 5: Generate report with enriched analysis data
+        logger.info("Step 5: Generating report")
+        report_path = await self.report_service.generate_report(
+            document_id=document_id,
+            document=document,
+            interventions=self.db.query(Intervention).options(
+                selectinload(Intervention.cost_items)
+            ).filter(
+                Intervention.document_id == document_id
+            ).all(),
+            total_cost=total_cost,
+            analysis=analysis
+        )
+        analysis.report_path = report_path
+        analysis.report_generated_at = datetime.now()
+        
+        self.db.commit()
+        
+        logger.info(f"Analysis completed for document {document_id}. Total cost: ₹{total_cost:,.2f}")
+    
+    async def _process_intervention(
+        self,
+        document_id: int,
+        idx: int,
+        count: int,
+        intervention_data: Dict
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Map one intervention to IRC standards and price it; returns rows, writes nothing"""
+        logger.info(f"Processing intervention {idx+1}/{count}: {intervention_data['intervention_type']}")
+        
+        # Find relevant IRC standards
+        irc_standards = await self.rag_service.find_relevant_standards(intervention_data)
+        irc_codes = [std['code'] for std in irc_standards]
+        irc_clauses = []
+        for std in irc_standards:
+            if std.get('matched_clause'):
+                irc_clauses.append(f"{std['code']} - Clause {std['matched_clause']}")
+        
+        intervention_row = {
+            'document_id': document_id,
+            'intervention_type': intervention_data['intervention_type'],
+            'description': intervention_data['description'],
+            'location': intervention_data.get('location'),
+            'chainage': intervention_data.get('chainage'),
+            'specifications': intervention_data.get('specifications'),
+            'irc_standards': irc_codes,
+            'irc_clauses': irc_clauses,
+            'confidence_score': intervention_data.get('confidence_score'),
+            'extraction_method': intervention_data.get('extraction_method')
+        }
+        
+        # Step 4: Calculate costs
+        cost_data = await self._calculate_intervention_cost(intervention_data)
+        
+        return intervention_row, cost_data
+    
     async def _calculate_intervention_cost(
         self, 
-        intervention_data: Dict,
-        intervention_id: int
+        intervention_data: Dict
     ) -> Optional[Dict[str, Any]]:
-        """Calculate cost for an intervention"""
+        """Calculate cost for an intervention; cost item rows are returned, not inserted"""
         
         total_cost = 0.0
         assumptions = []
         warnings = []
+        cost_items = []
         
         # Determine materials needed based on intervention type
         materials = self._identify_materials(intervention_data)
@@ -174,47 +323,45 @@ class AnalysisService:
             assumptions.append(f"Material estimation required for {intervention_data['intervention_type']}")
             return None
         
-        # Get pricing for each material
-        for material in materials:
-            try:
-                price_data = await self.pricing_service.get_material_price(
-                    material_name=material['name'],
-                    quantity=material['quantity'],
-                    unit=material['unit']
-                )
-                
-                # Create cost item
-                cost_item = CostItem(
-                    intervention_id=intervention_id,
-                    material_name=material['name'],
-                    material_category=material.get('category'),
-                    specification=material.get('specification'),
-                    quantity=material['quantity'],
-                    unit=material['unit'],
-                    unit_rate=price_data['unit_rate'],
-                    total_cost=price_data['total_cost'],
-                    price_source=price_data['source'],
-                    price_source_reference=price_data.get('source_reference'),
-                    price_fetched_at=price_data['fetched_at']
-                )
-                self.db.add(cost_item)
-                
-                total_cost += price_data['total_cost']
-                
-                # Track assumptions and warnings
-                if price_data.get('is_estimate'):
-                    assumptions.append(f"Estimated rate used for {material['name']}")
-                if price_data.get('requires_verification'):
-                    warnings.append(f"Price verification required for {material['name']}")
-                
-            except Exception as e:
-                logger.error(f"Error getting price for {material['name']}: {str(e)}")
-                warnings.append(f"Failed to get price for {material['name']}")
+        # Get pricing for all materials with batched cache lookups
+        try:
+            prices = await self.pricing_service.get_material_prices([
+                (material['name'], material['quantity'], material['unit'])
+                for material in materials
+            ])
+        except Exception as e:
+            logger.error(f"Error getting prices for {intervention_data['intervention_type']}: {str(e)}")
+            warnings.extend(f"Failed to get price for {material['name']}" for material in materials)
+            prices = []
+        
+        for material, price_data in zip(materials, prices):
+            # Queue cost item row
+            cost_items.append({
+                'material_name': material['name'],
+                'material_category': material.get('category'),
+                'specification': material.get('specification'),
+                'quantity': material['quantity'],
+                'unit': material['unit'],
+                'unit_rate': price_data['unit_rate'],
+                'total_cost': price_data['total_cost'],
+                'price_source': price_data['source'],
+                'price_source_reference': price_data.get('source_reference'),
+                'price_fetched_at': price_data['fetched_at']
+            })
+            
+            total_cost += price_data['total_cost']
+            
+            # Track assumptions and warnings
+            if price_data.get('is_estimate'):
+                assumptions.append(f"Estimated rate used for {material['name']}")
+            if price_data.get('requires_verification'):
+                warnings.append(f"Price verification required for {material['name']}")
         
         return {
             'total_cost': total_cost,
             'assumptions': assumptions,
-            'warnings': warnings
+            'warnings': warnings,
+            'cost_items': cost_items
         }
     
     def _identify_materials(self, intervention_data: Dict) -> List[Dict[str, Any]]:
@@ -1,14 +1,17 @@
 """
 Document processing service
 """
+import asyncio
 import logging
-import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.engine import RowMapping
 from sqlalchemy.orm import Session
 
 from app.db.models import Document, DocumentStatus
+from app.core.cache import analysis_cache_key, document_cache_key, response_cache
 from app.core.config import settings
 from app.utils.file_utils import generate_unique_filename
 
@@ -21,6 +24,14 @@ class DocumentService:
     def __init__(self, db: Session):
         self.db = db
     
+    def allocate_upload_path(self, original_filename: str) -> Path:
+        """
+        Reserve the final storage path for an incoming upload
+        """
+        dest_dir = Path(settings.TEMP_UPLOAD_DIR)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        return dest_dir / generate_unique_filename(original_filename)
+    
     async def save_document(
         self,
         file_path: str,
@@ -30,38 +41,33 @@ class DocumentService:
         upload_ip: Optional[str] = None
     ) -> Document:
         """
-        Save uploaded document to persistent storage
+        Record an uploaded document already written to its storage path
         """
+        stored_path = Path(file_path)
+        
+        # Create database record
+        document = Document(
+            filename=stored_path.name,
+            original_filename=original_filename,
+            file_path=str(stored_path),
+            file_size=file_size,
+            mime_type=mime_type,
+            status=DocumentStatus.UPLOADED.value,
+            upload_ip=upload_ip
+        )
+        
+        # The session is sync; keep its commit round-trips off the event loop
+        await asyncio.to_thread(self._insert_document, document)
+        
+        logger.info(f"Document saved: {document.id} - {original_filename}")
+        return document
+    
+    def _insert_document(self, document: Document):
+        """Insert and refresh a document, rolling back on failure"""
         try:
-            # Generate unique filename
-            unique_filename = generate_unique_filename(original_filename)
-            
-            # Create destination path
-            dest_dir = Path(settings.TEMP_UPLOAD_DIR)
-            dest_dir.mkdir(parents=True, exist_ok=True)
-            dest_path = dest_dir / unique_filename
-            
-            # Move file
-            shutil.move(file_path, dest_path)
-            
-            # Create database record
-            document = Document(
-                filename=unique_filename,
-                original_filename=original_filename,
-                file_path=str(dest_path),
-                file_size=file_size,
-                mime_type=mime_type,
-                status=DocumentStatus.UPLOADED,
-                upload_ip=upload_ip
-            )
-            
             self.db.add(document)
             self.db.commit()
             self.db.refresh(document)
-            
-            logger.info(f"Document saved: {document.id} - {original_filename}")
-            return document
-            
         except Exception as e:
             logger.error(f"Error saving document: {str(e)}", exc_info=True)
             self.db.rollback()
@@ -71,9 +77,25 @@ class DocumentService:
         """Get document by ID"""
         return self.db.query(Document).filter(Document.id == document_id).first()
     
-    def list_documents(self, skip: int = 0, limit: int = 50) -> List[Document]:
-        """List documents"""
-        return self.db.query(Document).order_by(Document.created_at.desc()).offset(skip).limit(limit).all()
+    def list_documents(self, skip: int = 0, limit: int = 50) -> List[RowMapping]:
+        """List documents as plain column rows (no ORM hydration)"""
+        stmt = (
+            select(
+                Document.id,
+                Document.filename,
+                Document.original_filename,
+                Document.file_size,
+                Document.mime_type,
+                Document.status,
+                Document.processing_error,
+                Document.created_at,
+                Document.updated_at,
+            )
+            .order_by(Document.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return self.db.execute(stmt).mappings().all()
     
     def update_status(
         self,
@@ -84,7 +106,7 @@ class DocumentService:
         """Update document status"""
         document = self.get_document(document_id)
         if document:
-            document.status = status
+            document.status = status.value
             if error:
                 document.processing_error = error
             if status == DocumentStatus.PROCESSING:
@@ -93,11 +115,32 @@ class DocumentService:
                 document.processing_completed_at = datetime.now()
             
             self.db.commit()
+            response_cache.invalidate(
+                document_cache_key(document_id),
+                analysis_cache_key(document_id)
+            )
             logger.info(f"Document {document_id} status updated to {status}")
     
     def update_extracted_text(self, document_id: int, text: str):
-        """Update extracted text"""
-        document = self.get_document(document_id)
+        """
+        Update extracted text
+        
+        Texts longer than EXTRACTED_TEXT_DB_MAX_CHARS go to
+        extracted_text_path() instead of a large TOASTed column update.
+        """
+        document = self.db.get(Document, document_id)
         if document:
-            document.extracted_text = text
+            if text and len(text) > settings.EXTRACTED_TEXT_DB_MAX_CHARS:
+                text_path = self.extracted_text_path(document_id)
+                text_path.parent.mkdir(parents=True, exist_ok=True)
+                text_path.write_text(text, encoding="utf-8")
+                document.extracted_text = None
+                logger.info(f"Extracted text for document {document_id} stored at {text_path}")
+            else:
+                document.extracted_text = text
             self.db.commit()
+    
+    @staticmethod
+    def extracted_text_path(document_id: int) -> Path:
+        """Where extracted text is kept when it is too large for the database"""
+        return Path(settings.PROCESSED_DIR) / f"{document_id}.txt"
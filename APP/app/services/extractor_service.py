@@ -2,27 +2,65 @@
 Document text extraction service
 Handles PDF, DOCX, images, and plain text
 """
+import asyncio
+import io
 import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
 import PyPDF2
 import docx
-from PIL import Image
-import pytesseract
-from pdf2image import convert_from_path
+from tesserocr import OEM, PSM, PyTessBaseAPI
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# tesserocr releases the GIL during recognition, so threads give real per-page
+# parallelism without forking or pickling page images
+ocr_executor = ThreadPoolExecutor(
+    max_workers=settings.OCR_WORKERS or os.cpu_count() or 1,
+    thread_name_prefix="ocr"
+)
+
+# MuPDF is not thread-safe, so every PDF open/read/render goes through one thread
+pdf_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf")
+
+# Pages rendered per pdf_executor call before they are handed to OCR
+RENDER_CHUNK_PAGES = 4
+
+
+# Pages whose text layer is shorter than this are treated as scanned
+OCR_PAGE_MIN_CHARS = 50
+
+# Larger PDFs are parsed from a buffered file instead of an in-memory copy
+PYPDF2_IN_MEMORY_MAX_BYTES = 64 * 1024 * 1024
+
+# Images with fewer grey (non 0/255) pixels than this are not re-thresholded
+BINARY_MIDTONE_FRACTION = 0.05
+
+# One tesseract engine per OCR thread; loading the model costs ~100ms
+_tesseract_local = threading.local()
+
+
+def _tesseract_api() -> PyTessBaseAPI:
+    api = getattr(_tesseract_local, "api", None)
+    if api is None:
+        # LSTM engine only, one uniform text block: skips orientation/script detection
+        api = PyTessBaseAPI(lang='eng', oem=OEM.LSTM_ONLY, psm=PSM.SINGLE_BLOCK)
+        _tesseract_local.api = api
+    return api
+
 
 class DocumentExtractor:
     """Extract text from various document formats"""
     
-    def __init__(self):
-        # Set tesseract path
-        pytesseract.pytesseract.tesseract_cmd = settings.TESSERACT_PATH
-    
     async def extract_text(self, file_path: str) -> str:
         """
         Extract text from document based on file type
@@ -47,63 +85,173 @@ class DocumentExtractor:
             raise
     
     async def _extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF"""
-        text = ""
+        """Extract text from PDF, OCR-ing only pages without a usable text layer"""
+        loop = asyncio.get_running_loop()
         
         try:
             # Try direct text extraction first
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
-            
-            # If no text extracted, use OCR
-            if len(text.strip()) < 100:
-                logger.info(f"PDF appears to be scanned. Using OCR...")
-                text = await self._ocr_pdf(file_path)
-            
-            return text.strip()
-        
+            page_texts = await loop.run_in_executor(pdf_executor, self._read_pdf_text_layer, file_path)
         except Exception as e:
-            logger.error(f"Error extracting from PDF: {str(e)}")
-            # Fallback to OCR
-            return await self._ocr_pdf(file_path)
+            logger.warning(f"MuPDF could not read PDF, falling back to PyPDF2: {str(e)}")
+            try:
+                page_texts = await loop.run_in_executor(None, self._read_pdf_text_layer_pypdf2, file_path)
+            except Exception as e:
+                logger.error(f"Error extracting from PDF: {str(e)}")
+                # Fallback to OCR
+                return await self._ocr_pdf(file_path)
+        
+        # OCR only the pages that look scanned
+        ocr_page_numbers = [
+            page_num for page_num, page_text in enumerate(page_texts, start=1)
+            if len(page_text.strip()) < OCR_PAGE_MIN_CHARS
+        ]
+        if ocr_page_numbers:
+            logger.info(f"{len(ocr_page_numbers)} of {len(page_texts)} PDF pages appear to be scanned. Using OCR...")
+            ocr_texts = await self._ocr_pages(file_path, ocr_page_numbers)
+            for page_num, ocr_text in zip(ocr_page_numbers, ocr_texts):
+                page_texts[page_num - 1] = ocr_text
+        
+        return "\n".join(page_text for page_text in page_texts if page_text).strip()
+    
+    @staticmethod
+    def _read_pdf_text_layer(file_path: str) -> List[str]:
+        with fitz.open(file_path) as pdf:
+            return [page.get_text("text") for page in pdf]
+    
+    @staticmethod
+    def _read_pdf_text_layer_pypdf2(file_path: str) -> List[str]:
+        # One read up front; PyPDF2 otherwise issues many small reads while parsing.
+        # Files too large to copy into memory get a 1MB read buffer instead.
+        if os.path.getsize(file_path) <= PYPDF2_IN_MEMORY_MAX_BYTES:
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(Path(file_path).read_bytes()))
+            return [page.extract_text() or "" for page in pdf_reader.pages]
+        
+        with open(file_path, 'rb', buffering=1 << 20) as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            return [page.extract_text() or "" for page in pdf_reader.pages]
     
     async def _ocr_pdf(self, file_path: str) -> str:
-        """Perform OCR on PDF"""
-        text = ""
+        """Perform OCR on every page of a PDF"""
         try:
-            # Convert PDF to images
-            images = convert_from_path(file_path, dpi=300)
-            
-            # OCR each page
-            for i, image in enumerate(images):
-                logger.info(f"OCR processing page {i+1}/{len(images)}")
-                page_text = pytesseract.image_to_string(image, lang='eng')
-                text += page_text + "\n"
-            
-            return text.strip()
+            loop = asyncio.get_running_loop()
+            page_count = await loop.run_in_executor(pdf_executor, self._pdf_page_count, file_path)
+            page_texts = await self._ocr_pages(file_path, list(range(1, page_count + 1)))
+            return "\n".join(page_texts).strip()
         
         except Exception as e:
             logger.error(f"Error in OCR: {str(e)}")
             raise
     
+    @staticmethod
+    def _pdf_page_count(file_path: str) -> int:
+        with fitz.open(file_path) as pdf:
+            return pdf.page_count
+    
+    async def _ocr_pages(self, file_path: str, page_numbers: List[int]) -> List[str]:
+        """OCR the given 1-based PDF pages, returning their text in the same order"""
+        loop = asyncio.get_running_loop()
+        logger.info(f"OCR processing {len(page_numbers)} pages")
+        
+        # Render in chunks straight to disk and queue each chunk for OCR as soon
+        # as it is written, so tesseract works while MuPDF renders the next chunk
+        with tempfile.TemporaryDirectory(prefix="ocr-") as tmpdir:
+            ocr_futures = []
+            try:
+                for i in range(0, len(page_numbers), RENDER_CHUNK_PAGES):
+                    chunk = page_numbers[i:i + RENDER_CHUNK_PAGES]
+                    page_paths = await loop.run_in_executor(
+                        pdf_executor, self._render_pages, file_path, chunk, settings.OCR_DPI, tmpdir
+                    )
+                    ocr_futures.extend(
+                        ocr_executor.submit(self._ocr_page, file_path, tmpdir, page_num, page_path)
+                        for page_num, page_path in zip(chunk, page_paths)
+                    )
+                
+                # gather keeps page order
+                return list(await asyncio.gather(*map(asyncio.wrap_future, ocr_futures)))
+            
+            except BaseException:
+                # Drop pages still queued and let running ones finish before the
+                # directory they read from and retry-render into is removed
+                for future in ocr_futures:
+                    future.cancel()
+                await asyncio.gather(*map(asyncio.wrap_future, ocr_futures), return_exceptions=True)
+                raise
+    
+    @staticmethod
+    def _render_pages(file_path: str, page_numbers: List[int], dpi: int, output_folder: str) -> List[str]:
+        """Render 1-based pages to grayscale PNGs in output_folder and return their paths"""
+        image_paths = []
+        with fitz.open(file_path) as pdf:
+            for page_num in page_numbers:
+                pixmap = pdf[page_num - 1].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+                image_path = os.path.join(output_folder, f"page-{page_num:05d}-{dpi}.png")
+                pixmap.save(image_path)
+                image_paths.append(image_path)
+        return image_paths
+    
+    def _ocr_page(self, file_path: str, output_folder: str, page_number: int, image_path: str) -> str:
+        """OCR one rendered page, re-rendering at OCR_RETRY_DPI if confidence is low"""
+        text, confidence = self._ocr_image(self._binarize_image(image_path, image_path))
+        
+        if confidence < settings.OCR_MIN_CONFIDENCE and settings.OCR_DPI < settings.OCR_RETRY_DPI:
+            logger.info(
+                f"Page {page_number} OCR confidence {confidence:.0f} at {settings.OCR_DPI} DPI, "
+                f"retrying at {settings.OCR_RETRY_DPI} DPI"
+            )
+            retry_paths = pdf_executor.submit(
+                self._render_pages, file_path, [page_number], settings.OCR_RETRY_DPI, output_folder
+            ).result()
+            text, _ = self._ocr_image(self._binarize_image(retry_paths[0], retry_paths[0]))
+        
+        return text
+    
+    @staticmethod
+    def _binarize_image(image_path: str, output_path: str) -> str:
+        """
+        Write a grayscale, adaptively thresholded copy of the image to output_path
+        Returns the path tesseract should read; already-binary or unreadable images
+        are passed through unchanged.
+        """
+        gray = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            return image_path
+        
+        # Skip images that are already (almost) pure black and white
+        midtones = np.count_nonzero((gray > 0) & (gray < 255))
+        if midtones < BINARY_MIDTONE_FRACTION * gray.size:
+            return image_path
+        
+        binary = cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+        )
+        cv2.imwrite(output_path, binary)
+        return output_path
+    
+    @staticmethod
+    def _ocr_image(image_path: str) -> Tuple[str, float]:
+        """Return page text and mean word confidence from a single tesseract pass"""
+        # libtesseract reads the file itself; GIL is released while it recognizes
+        api = _tesseract_api()
+        api.SetImageFile(image_path)
+        text = api.GetUTF8Text()
+        return text, float(api.MeanTextConf())
+    
     async def _extract_from_docx(self, file_path: str) -> str:
         """Extract text from DOCX"""
         try:
             doc = docx.Document(file_path)
-            text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
+            parts = [paragraph.text for paragraph in doc.paragraphs if paragraph.text]
             
             # Also extract from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += "\n" + cell.text
+            parts.extend(
+                cell.text
+                for table in doc.tables
+                for row in table.rows
+                for cell in row.cells
+            )
             
-            return text.strip()
+            return "\n".join(parts).strip()
         
         except Exception as e:
             logger.error(f"Error extracting from DOCX: {str(e)}")
@@ -111,21 +259,32 @@ class DocumentExtractor:
     
     async def _extract_from_text(self, file_path: str) -> str:
         """Extract text from plain text file"""
+        return await asyncio.to_thread(self._read_text_file, file_path)
+    
+    @staticmethod
+    def _read_text_file(file_path: str) -> str:
+        # Read once; the latin-1 fallback decodes the same bytes
+        data = Path(file_path).read_bytes()
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read().strip()
+            return data.decode('utf-8').strip()
         except UnicodeDecodeError:
             # Try different encoding
-            with open(file_path, 'r', encoding='latin-1') as file:
-                return file.read().strip()
+            return data.decode('latin-1').strip()
     
     async def _extract_from_image(self, file_path: str) -> str:
         """Extract text from image using OCR"""
         try:
-            image = Image.open(file_path)
-            text = pytesseract.image_to_string(image, lang='eng')
+            loop = asyncio.get_running_loop()
+            text = await loop.run_in_executor(ocr_executor, self._ocr_image_file, file_path)
             return text.strip()
         
         except Exception as e:
             logger.error(f"Error extracting from image: {str(e)}")
             raise
+    
+    def _ocr_image_file(self, file_path: str) -> str:
+        # Binarize into a scratch file so the upload itself is left untouched
+        with tempfile.TemporaryDirectory(prefix="ocr-") as tmpdir:
+            image_path = self._binarize_image(file_path, os.path.join(tmpdir, "image.png"))
+            text, _ = self._ocr_image(image_path)
+            return text
@@ -0,0 +1,161 @@
+"""
+IRC standards reference data
+Static corpus indexed by RAGService; shared read-only across service instances
+"""
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Tuple
+
+# IRC Standards data (in production, load from files/database)
+IRC_STANDARDS: Tuple[Mapping[str, Any], ...] = (
+    MappingProxyType({
+        'code': 'IRC 35',
+        'title': 'Code of Practice for Road Markings',
+        'description': 'Covers specifications for road markings including pavement markings, object markers, delineators, and hazard markers. Specifies materials, colors, dimensions, and retroreflectivity requirements.',
+        'clauses': {
+            '4.1': 'White and yellow thermoplastic paint for road markings',
+            '4.2': 'Retroreflective road studs and cat eyes',
+            '5.1': 'Center line markings specifications',
+            '5.2': 'Edge line markings',
+            '6.1': 'Pedestrian crossing markings (zebra crossings)',
+            '7.1': 'Stop lines and give way markings'
+        },
+        'applications': ['road marking', 'pavement marking', 'line marking', 'pedestrian crossing', 'zebra crossing']
+    }),
+    MappingProxyType({
+        'code': 'IRC 67',
+        'title': 'Code of Practice for Road Signs',
+        'description': 'Guidelines for design, placement, and specifications of road traffic signs including regulatory, warning, and informatory signs. Covers materials, reflectivity, and mounting requirements.',
+        'clauses': {
+            '4.1': 'Regulatory signs (mandatory, prohibitory)',
+            '4.2': 'Warning signs for hazards',
+            '4.3': 'Informatory signs (route guidance)',
+            '5.1': 'Sign dimensions and letter sizes',
+            '6.1': 'Retroreflective sheeting specifications',
+            '7.1': 'Sign placement and mounting heights'
+        },
+        'applications': ['traffic sign', 'warning sign', 'mandatory sign', 'regulatory sign', 'guide sign', 'signage']
+    }),
+    MappingProxyType({
+        'code': 'IRC 99',
+        'title': 'Tentative Guidelines on the Provision of Facilities for Pedestrians',
+        'description': 'Guidelines for pedestrian infrastructure including footpaths, crossings, overpasses, underpasses, and pedestrian safety measures.',
+        'clauses': {
+            '5.1': 'Footpath width and design requirements',
+            '5.2': 'Surface requirements for footpaths',
+            '6.1': 'At-grade pedestrian crossings',
+            '6.2': 'Pedestrian signals and refuge islands',
+            '7.1': 'Pedestrian overpasses and underpasses',
+            '8.1': 'Ramps and tactile paving for accessibility'
+        },
+        'applications': ['footpath', 'footway', 'sidewalk', 'pedestrian crossing', 'pedestrian facility']
+    }),
+    MappingProxyType({
+        'code': 'IRC SP:84',
+        'title': 'Manual for Road Safety Audits',
+        'description': 'Comprehensive manual for conducting road safety audits at all stages of road projects. Covers audit procedures, safety checkpoints, and intervention recommendations.',
+        'clauses': {
+            '4.1': 'Safety audit at feasibility stage',
+            '4.2': 'Safety audit at design stage',
+            '5.1': 'Pre-opening safety audit',
+            '6.1': 'Road safety inspections',
+            '7.1': 'Black spot identification and treatment',
+            '8.1': 'Safety interventions and countermeasures'
+        },
+        'applications': ['safety audit', 'black spot', 'hazard', 'safety intervention', 'crash analysis']
+    }),
+    MappingProxyType({
+        'code': 'IRC SP:87',
+        'title': 'Manual of Specifications and Standards for Four Laning of Highways',
+        'description': 'Standards for widening and upgrading highways to four lanes, including safety features, barriers, medians, and auxiliary facilities.',
+        'clauses': {
+            '8.1': 'Median design and barriers',
+            '8.2': 'Crash barriers and guardrails',
+            '9.1': 'Road furniture and safety appurtenances',
+            '10.1': 'Street lighting and illumination',
+            '11.1': 'Traffic signs and road markings',
+            '12.1': 'Drainage and road safety'
+        },
+        'applications': ['median', 'crash barrier', 'guardrail', 'safety barrier', 'illumination', 'street light']
+    }),
+    MappingProxyType({
+        'code': 'IRC 19',
+        'title': 'Geometric Design Standards for Rural (Non-Urban) Highways',
+        'description': 'Standards for geometric design including alignment, cross-section, sight distance, and safety features for rural highways.',
+        'clauses': {
+            '7.1': 'Road shoulder specifications',
+            '7.2': 'Roadside safety and clear zones',
+            '8.1': 'Horizontal and vertical curves',
+            '9.1': 'Sight distance requirements',
+            '10.1': 'Junction and intersection design'
+        },
+        'applications': ['shoulder', 'verge', 'alignment', 'junction', 'intersection', 'roundabout']
+    }),
+    MappingProxyType({
+        'code': 'IRC 103',
+        'title': 'Guidelines for Pedestrian Facilities',
+        'description': 'Detailed guidelines for providing safe pedestrian facilities including walkways, crossings, and grade-separated facilities.',
+        'clauses': {
+            '4.1': 'Pedestrian facility planning',
+            '5.1': 'Footpath design standards',
+            '6.1': 'At-grade crossing design',
+            '7.1': 'Grade-separated crossings'
+        },
+        'applications': ['pedestrian', 'footpath', 'crossing', 'walkway']
+    }),
+    MappingProxyType({
+        'code': 'IRC 11',
+        'title': 'Recommended Practice for the Design of At-Grade Extra-Urban Intersections',
+        'description': 'Design guidelines for intersections including channelization, traffic islands, and safety measures.',
+        'clauses': {
+            '5.1': 'Intersection types and selection',
+            '6.1': 'Channelization design',
+            '7.1': 'Traffic islands and medians',
+            '8.1': 'Sight distance at intersections'
+        },
+        'applications': ['intersection', 'junction', 'channelization', 'traffic island']
+    }),
+)
+
+
+def _build_corpus():
+    documents = []
+    metadatas = []
+    ids = []
+    kw_index = defaultdict(list)
+    
+    for std in IRC_STANDARDS:
+        for application in std['applications']:
+            kw_index[application.lower().strip()].append(std['code'])
+        
+        # Main standard document
+        doc_text = f"{std['code']}: {std['title']}\n{std['description']}"
+        documents.append(doc_text)
+        metadatas.append({
+            'code': std['code'],
+            'title': std['title'],
+            'type': 'standard'
+        })
+        ids.append(std['code'])
+        
+        # Index individual clauses
+        for clause_num, clause_text in std.get('clauses', {}).items():
+            clause_doc = f"{std['code']} Clause {clause_num}: {clause_text}"
+            documents.append(clause_doc)
+            metadatas.append({
+                'code': std['code'],
+                'clause': clause_num,
+                'type': 'clause'
+            })
+            ids.append(f"{std['code']}_clause_{clause_num}")
+    
+    return tuple(ids), tuple(documents), tuple(metadatas), dict(kw_index)
+
+
+# Documents to embed, their ids and metadata, built once at import
+IRC_IDS: Tuple[str, ...]
+IRC_DOCUMENTS: Tuple[str, ...]
+IRC_METADATAS: Tuple[Dict[str, Any], ...]
+# applications keyword -> standard codes
+IRC_KEYWORD_INDEX: Dict[str, List[str]]
+IRC_IDS, IRC_DOCUMENTS, IRC_METADATAS, IRC_KEYWORD_INDEX = _build_corpus()
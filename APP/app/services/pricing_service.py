@@ -2,200 +2,307 @@
 Pricing service for fetching material costs from government sources
 Integrates with CPWD SOR/AOR and GeM marketplace
 """
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import re
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import List, Dict, Any, Mapping, Optional, Tuple
 from datetime import datetime, timedelta
 import httpx
 import json
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
+import orjson
 import redis
-import pickle
+import redis.asyncio as aioredis
 
 from app.core.config import settings
+from app.db.database import SessionLocal
 from app.db.models import PriceCache
 
 logger = logging.getLogger(__name__)
 
+# Process-wide LRU of recently resolved prices, shared by every PricingService
+# instance: (material_name, unit) -> (expires_at monotonic seconds, price)
+_hot_prices: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_price_key(value: str) -> str:
+    """Case- and whitespace-insensitive form of a material name or unit"""
+    return _WHITESPACE_RE.sub(" ", value.strip().lower())
+
+
+def price_cache_key(material_name: str, unit: str) -> Tuple[str, str]:
+    return normalize_price_key(material_name), normalize_price_key(unit)
+
+
+# Material mapping for common interventions, built once and shared read-only
+# by every PricingService
+MATERIAL_DATABASE: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    # Safety Barriers
+    'Steel Crash Barrier': {
+        'category': 'Safety Barrier',
+        'unit': 'm',
+        'cpwd_code': 'CPWD-SOR-2023-12.45',
+        'gem_category': 'Road Safety Equipment',
+        'specifications': 'Galvanized steel W-beam, AASHTO M-180',
+        'typical_rate': 1850.0
+    },
+    'Concrete Safety Barrier': {
+        'category': 'Safety Barrier',
+        'unit': 'm',
+        'cpwd_code': 'CPWD-SOR-2023-12.46',
+        'specifications': 'RCC Jersey barrier, M30 grade',
+        'typical_rate': 2200.0
+    },
+    'Guardrail Post': {
+        'category': 'Safety Barrier',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-12.47',
+        'specifications': 'MS post, galvanized, 2.5m height',
+        'typical_rate': 850.0
+    },
+    
+    # Road Markings
+    'Thermoplastic Paint': {
+        'category': 'Road Marking',
+        'unit': 'kg',
+        'cpwd_code': 'CPWD-SOR-2023-18.23',
+        'gem_category': 'Road Marking Materials',
+        'specifications': 'White/yellow thermoplastic, Type-II',
+        'typical_rate': 185.0
+    },
+    'Cold Paint': {
+        'category': 'Road Marking',
+        'unit': 'ltr',
+        'cpwd_code': 'CPWD-SOR-2023-18.24',
+        'specifications': 'Chlorinated rubber based paint',
+        'typical_rate': 95.0
+    },
+    'Glass Beads': {
+        'category': 'Road Marking',
+        'unit': 'kg',
+        'cpwd_code': 'CPWD-SOR-2023-18.25',
+        'specifications': 'Retroreflective glass beads, Type-A',
+        'typical_rate': 42.0
+    },
+    
+    # Road Studs
+    'Cat Eye Road Stud': {
+        'category': 'Delineation',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-18.31',
+        'gem_category': 'Road Safety Equipment',
+        'specifications': 'Reflective, aluminum body',
+        'typical_rate': 125.0
+    },
+    'Solar Road Stud': {
+        'category': 'Delineation',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-18.32',
+        'specifications': 'LED, solar powered, IP68',
+        'typical_rate': 850.0
+    },
+    
+    # Signs
+    'Traffic Sign Board': {
+        'category': 'Signage',
+        'unit': 'sqm',
+        'cpwd_code': 'CPWD-SOR-2023-18.15',
+        'gem_category': 'Traffic Signs',
+        'specifications': 'Aluminum sheet, Grade-III retroreflective',
+        'typical_rate': 3200.0
+    },
+    'Sign Post': {
+        'category': 'Signage',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-18.16',
+        'specifications': 'MS square hollow section, galvanized',
+        'typical_rate': 1850.0
+    },
+    
+    # Speed Control
+    'Rumble Strip': {
+        'category': 'Traffic Calming',
+        'unit': 'm',
+        'cpwd_code': 'CPWD-SOR-2023-18.42',
+        'specifications': 'Thermoplastic or milled asphalt',
+        'typical_rate': 450.0
+    },
+    'Speed Hump': {
+        'category': 'Traffic Calming',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-18.43',
+        'specifications': 'Rubber/plastic, 3.7m x 350mm x 50mm',
+        'typical_rate': 4500.0
+    },
+    
+    # Pedestrian Facilities
+    'Footpath Paving': {
+        'category': 'Pedestrian Facility',
+        'unit': 'sqm',
+        'cpwd_code': 'CPWD-SOR-2023-14.35',
+        'specifications': 'Concrete paver blocks, 60mm thick',
+        'typical_rate': 425.0
+    },
+    'Tactile Paving': {
+        'category': 'Pedestrian Facility',
+        'unit': 'sqm',
+        'cpwd_code': 'CPWD-SOR-2023-14.36',
+        'specifications': 'Warning/directional tiles, vitrified',
+        'typical_rate': 850.0
+    },
+    'Pedestrian Railing': {
+        'category': 'Pedestrian Facility',
+        'unit': 'm',
+        'cpwd_code': 'CPWD-SOR-2023-12.52',
+        'specifications': 'MS railing, powder coated, 1.1m height',
+        'typical_rate': 1250.0
+    },
+    
+    # Lighting
+    'LED Street Light': {
+        'category': 'Illumination',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-16.25',
+        'gem_category': 'LED Street Lights',
+        'specifications': '150W LED, IP65, 4000K',
+        'typical_rate': 12500.0
+    },
+    'Light Pole': {
+        'category': 'Illumination',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-16.26',
+        'specifications': 'MS octagonal pole, 9m, galvanized',
+        'typical_rate': 8500.0
+    },
+    
+    # Delineators
+    'Flexible Delineator': {
+        'category': 'Delineation',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-18.35',
+        'specifications': 'PU/rubber, 750mm, retroreflective',
+        'typical_rate': 650.0
+    },
+    'Chevron Marker': {
+        'category': 'Delineation',
+        'unit': 'nos',
+        'cpwd_code': 'CPWD-SOR-2023-18.36',
+        'specifications': 'Aluminum, Grade-I retroreflective',
+        'typical_rate': 1250.0
+    },
+})
+
+# Normalized names, computed once for fuzzy matching (insertion order kept)
+_MATERIAL_NAMES_LOWER = [(normalize_price_key(name), name) for name in MATERIAL_DATABASE]
+_MATERIAL_LOWER_INDEX = {lower: name for lower, name in reversed(_MATERIAL_NAMES_LOWER)}
+
+
+# Async Redis and HTTP clients shared by every PricingService on the same event
+# loop, so connections (and upstream TLS sessions) are reused across documents
+_redis_client: Optional[aioredis.Redis] = None
+_http_client: Optional[httpx.AsyncClient] = None
+_clients_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _bind_clients_to_running_loop():
+    global _redis_client, _http_client, _clients_loop
+    loop = asyncio.get_running_loop()
+    if _clients_loop is not loop:
+        _redis_client = None
+        _http_client = None
+        _clients_loop = loop
+
+
+def get_price_redis() -> aioredis.Redis:
+    """Return the price cache client for the running event loop, creating it lazily"""
+    global _redis_client
+    _bind_clients_to_running_loop()
+    if _redis_client is None:
+        _redis_client = aioredis.from_url(
+            settings.REDIS_URL,
+            decode_responses=False,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+    return _redis_client
+
+
+def get_price_http() -> httpx.AsyncClient:
+    """Return the upstream pricing HTTP/2 client for the running event loop"""
+    global _http_client
+    _bind_clients_to_running_loop()
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=5.0,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20)
+        )
+    return _http_client
+
+
+async def close_pricing_clients():
+    """Close the shared clients' connections (worker shutdown)"""
+    global _redis_client, _http_client, _clients_loop
+    if _redis_client is not None:
+        await _redis_client.aclose()
+    if _http_client is not None:
+        await _http_client.aclose()
+    _redis_client = None
+    _http_client = None
+    _clients_loop = None
+
 
 class PricingService:
     """Service for fetching and caching government pricing data"""
     
     def __init__(self, db: Session):
         self.db = db
-        self.redis_client = None
         
-        # Initialize Redis connection
-        try:
-            self.redis_client = redis.from_url(
-                settings.REDIS_URL,
-                decode_responses=False
-            )
-            self.redis_client.ping()
-            logger.info("Redis connection established")
-        except Exception as e:
-            logger.warning(f"Redis not available: {str(e)}")
-            self.redis_client = None
+        # Shared async client; connects on first command, no round trip here
+        self.redis_client = get_price_redis()
+        self.http_client = get_price_http()
         
         # Material mapping for common interventions
-        self.material_database = self._initialize_material_database()
+        self.material_database = MATERIAL_DATABASE
+        self._material_matches: Dict[str, Optional[Tuple[str, bool]]] = {}
     
-    def _initialize_material_database(self) -> Dict[str, Any]:
-        """Initialize material database with common road safety materials"""
-        return {
-            # Safety Barriers
-            'Steel Crash Barrier': {
-                'category': 'Safety Barrier',
-                'unit': 'm',
-                'cpwd_code': 'CPWD-SOR-2023-12.45',
-                'gem_category': 'Road Safety Equipment',
-                'specifications': 'Galvanized steel W-beam, AASHTO M-180',
-                'typical_rate': 1850.0
-            },
-            'Concrete Safety Barrier': {
-                'category': 'Safety Barrier',
-                'unit': 'm',
-                'cpwd_code': 'CPWD-SOR-2023-12.46',
-                'specifications': 'RCC Jersey barrier, M30 grade',
-                'typical_rate': 2200.0
-            },
-            'Guardrail Post': {
-                'category': 'Safety Barrier',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-12.47',
-                'specifications': 'MS post, galvanized, 2.5m height',
-                'typical_rate': 850.0
-            },
-            
-            # Road Markings
-            'Thermoplastic Paint': {
-                'category': 'Road Marking',
-                'unit': 'kg',
-                'cpwd_code': 'CPWD-SOR-2023-18.23',
-                'gem_category': 'Road Marking Materials',
-                'specifications': 'White/yellow thermoplastic, Type-II',
-                'typical_rate': 185.0
-            },
-            'Cold Paint': {
-                'category': 'Road Marking',
-                'unit': 'ltr',
-                'cpwd_code': 'CPWD-SOR-2023-18.24',
-                'specifications': 'Chlorinated rubber based paint',
-                'typical_rate': 95.0
-            },
-            'Glass Beads': {
-                'category': 'Road Marking',
-                'unit': 'kg',
-                'cpwd_code': 'CPWD-SOR-2023-18.25',
-                'specifications': 'Retroreflective glass beads, Type-A',
-                'typical_rate': 42.0
-            },
-            
-            # Road Studs
-            'Cat Eye Road Stud': {
-                'category': 'Delineation',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-18.31',
-                'gem_category': 'Road Safety Equipment',
-                'specifications': 'Reflective, aluminum body',
-                'typical_rate': 125.0
-            },
-            'Solar Road Stud': {
-                'category': 'Delineation',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-18.32',
-                'specifications': 'LED, solar powered, IP68',
-                'typical_rate': 850.0
-            },
-            
-            # Signs
-            'Traffic Sign Board': {
-                'category': 'Signage',
-                'unit': 'sqm',
-                'cpwd_code': 'CPWD-SOR-2023-18.15',
-                'gem_category': 'Traffic Signs',
-                'specifications': 'Aluminum sheet, Grade-III retroreflective',
-                'typical_rate': 3200.0
-            },
-            'Sign Post': {
-                'category': 'Signage',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-18.16',
-                'specifications': 'MS square hollow section, galvanized',
-                'typical_rate': 1850.0
-            },
-            
-            # Speed Control
-            'Rumble Strip': {
-                'category': 'Traffic Calming',
-                'unit': 'm',
-                'cpwd_code': 'CPWD-SOR-2023-18.42',
-                'specifications': 'Thermoplastic or milled asphalt',
-                'typical_rate': 450.0
-            },
-            'Speed Hump': {
-                'category': 'Traffic Calming',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-18.43',
-                'specifications': 'Rubber/plastic, 3.7m x 350mm x 50mm',
-                'typical_rate': 4500.0
-            },
-            
-            # Pedestrian Facilities
-            'Footpath Paving': {
-                'category': 'Pedestrian Facility',
-                'unit': 'sqm',
-                'cpwd_code': 'CPWD-SOR-2023-14.35',
-                'specifications': 'Concrete paver blocks, 60mm thick',
-                'typical_rate': 425.0
-            },
-            'Tactile Paving': {
-                'category': 'Pedestrian Facility',
-                'unit': 'sqm',
-                'cpwd_code': 'CPWD-SOR-2023-14.36',
-                'specifications': 'Warning/directional tiles, vitrified',
-                'typical_rate': 850.0
-            },
-            'Pedestrian Railing': {
-                'category': 'Pedestrian Facility',
-                'unit': 'm',
-                'cpwd_code': 'CPWD-SOR-2023-12.52',
-                'specifications': 'MS railing, powder coated, 1.1m height',
-                'typical_rate': 1250.0
-            },
-            
-            # Lighting
-            'LED Street Light': {
-                'category': 'Illumination',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-16.25',
-                'gem_category': 'LED Street Lights',
-                'specifications': '150W LED, IP65, 4000K',
-                'typical_rate': 12500.0
-            },
-            'Light Pole': {
-                'category': 'Illumination',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-16.26',
-                'specifications': 'MS octagonal pole, 9m, galvanized',
-                'typical_rate': 8500.0
-            },
-            
-            # Delineators
-            'Flexible Delineator': {
-                'category': 'Delineation',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-18.35',
-                'specifications': 'PU/rubber, 750mm, retroreflective',
-                'typical_rate': 650.0
-            },
-            'Chevron Marker': {
-                'category': 'Delineation',
-                'unit': 'nos',
-                'cpwd_code': 'CPWD-SOR-2023-18.36',
-                'specifications': 'Aluminum, Grade-I retroreflective',
-                'typical_rate': 1250.0
-            },
-        }
+    def _lookup_material(self, material_name: str) -> Optional[Tuple[str, Dict[str, Any], bool]]:
+        """
+        Match a name against the material database once per service instance
+        Returns (matched_name, info, exact); exact is False for case/fuzzy matches.
+        """
+        if material_name not in self._material_matches:
+            match = None
+            if material_name in self.material_database:
+                match = (material_name, True)
+            else:
+                # Try case-insensitive match, then fuzzy match
+                material_name_lower = normalize_price_key(material_name)
+                mat_name = _MATERIAL_LOWER_INDEX.get(material_name_lower)
+                if mat_name is None:
+                    mat_name = next(
+                        (
+                            name for lower, name in _MATERIAL_NAMES_LOWER
+                            if material_name_lower in lower or lower in material_name_lower
+                        ),
+                        None
+                    )
+                if mat_name is not None:
+                    match = (mat_name, False)
+            self._material_matches[material_name] = match
+        
+        match = self._material_matches[material_name]
+        if match is None:
+            return None
+        mat_name, exact = match
+        return mat_name, self.material_database[mat_name], exact
     
     async def get_material_price(
         self, 
@@ -207,76 +314,195 @@ class PricingService:
         """
         Get material price from cache or fetch from sources
         """
-        # Check cache first
-        cached_price = await self._get_cached_price(material_name, unit)
-        if cached_price:
-            logger.info(f"Using cached price for {material_name}")
-            return {
-                'material_name': material_name,
-                'quantity': quantity,
-                'unit': unit,
-                'unit_rate': cached_price['unit_rate'],
-                'total_cost': quantity * cached_price['unit_rate'],
-                'source': cached_price['source'],
-                'source_reference': cached_price['source_reference'],
-                'fetched_at': cached_price['fetched_at'],
-                'from_cache': True
-            }
+        prices = await self.get_material_prices([(material_name, quantity, unit)], location)
+        return prices[0]
+    
+    async def get_material_prices(
+        self,
+        items: List[Tuple[str, float, str]],
+        location: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Price several (material_name, quantity, unit) items, in order
+        Cache lookups are batched: one Redis MGET and one database query
+        """
+        # Cache keys are normalized so spelling variants share one entry;
+        # sources are queried with the first original spelling seen
+        item_keys = [price_cache_key(material_name, unit) for material_name, _, unit in items]
+        originals: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        for (material_name, _, unit), key in zip(items, item_keys):
+            originals.setdefault(key, (material_name, unit))
+        pairs = list(originals)
         
-        # Try to fetch from sources
-        price_data = await self._fetch_price_from_sources(material_name, unit, location)
+        # Check the in-process cache, then Redis/database
+        cached_prices = self._get_hot_prices(pairs)
+        remote_prices = await self._get_cached_prices(
+            [pair for pair in pairs if pair not in cached_prices]
+        )
+        self._remember_prices(remote_prices)
+        cached_prices.update(remote_prices)
         
-        if price_data:
-            # Cache the price
-            await self._cache_price(material_name, unit, price_data)
-            
-            return {
-                'material_name': material_name,
-                'quantity': quantity,
-                'unit': unit,
+        # Fetch the rest from sources concurrently (requests share the HTTP/2 client)
+        missing = [pair for pair in pairs if pair not in cached_prices]
+        source_prices = await asyncio.gather(*[
+            self._fetch_price_from_sources(*originals[pair], location)
+            for pair in missing
+        ])
+        
+        fetched_prices = {
+            key: price_data
+            for key, price_data in zip(missing, source_prices)
+            if price_data
+        }
+        
+        # Cache the prices in one batch
+        await self._cache_prices(fetched_prices)
+        self._remember_prices({
+            key: {
                 'unit_rate': price_data['unit_rate'],
-                'total_cost': quantity * price_data['unit_rate'],
                 'source': price_data['source'],
                 'source_reference': price_data.get('reference', ''),
-                'fetched_at': datetime.now(),
-                'from_cache': False
+                'fetched_at': datetime.now()
             }
+            for key, price_data in fetched_prices.items()
+        })
         
-        # Fallback to typical rate if available
-        return await self._get_fallback_price(material_name, quantity, unit)
+        results = []
+        for (material_name, quantity, unit), key in zip(items, item_keys):
+            cached_price = cached_prices.get(key)
+            price_data = fetched_prices.get(key)
+            
+            if cached_price:
+                logger.info(f"Using cached price for {material_name}")
+                results.append({
+                    'material_name': material_name,
+                    'quantity': quantity,
+                    'unit': unit,
+                    'unit_rate': cached_price['unit_rate'],
+                    'total_cost': quantity * cached_price['unit_rate'],
+                    'source': cached_price['source'],
+                    'source_reference': cached_price['source_reference'],
+                    'fetched_at': cached_price['fetched_at'],
+                    'from_cache': True
+                })
+            elif price_data:
+                results.append({
+                    'material_name': material_name,
+                    'quantity': quantity,
+                    'unit': unit,
+                    'unit_rate': price_data['unit_rate'],
+                    'total_cost': quantity * price_data['unit_rate'],
+                    'source': price_data['source'],
+                    'source_reference': price_data.get('reference', ''),
+                    'fetched_at': datetime.now(),
+                    'from_cache': False
+                })
+            else:
+                # Fallback to typical rate if available
+                results.append(await self._get_fallback_price(material_name, quantity, unit))
+        
+        return results
+    
+    @staticmethod
+    def _get_hot_prices(pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """Unexpired in-process cache hits for the given pairs"""
+        hot_prices = {}
+        now = time.monotonic()
+        for pair in pairs:
+            entry = _hot_prices.get(pair)
+            if entry is None:
+                continue
+            expires_at, price = entry
+            if expires_at < now:
+                del _hot_prices[pair]
+                continue
+            _hot_prices.move_to_end(pair)
+            hot_prices[pair] = price
+        return hot_prices
+    
+    @staticmethod
+    def _remember_prices(prices: Dict[Tuple[str, str], Dict]):
+        if settings.PRICE_LOCAL_CACHE_SIZE <= 0:
+            return
+        expires_at = time.monotonic() + settings.PRICE_LOCAL_CACHE_TTL
+        for pair, price in prices.items():
+            _hot_prices[pair] = (expires_at, price)
+            _hot_prices.move_to_end(pair)
+        while len(_hot_prices) > settings.PRICE_LOCAL_CACHE_SIZE:
+            _hot_prices.popitem(last=False)
     
-    async def _get_cached_price(self, material_name: str, unit: str) -> Optional[Dict]:
-        """Get price from cache"""
-        # Try Redis first
-        if self.redis_client:
-            try:
-                cache_key = f"price:{material_name}:{unit}"
-                cached = self.redis_client.get(cache_key)
+    async def _get_cached_prices(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """Get prices for normalized (material_name, unit) pairs from cache"""
+        cached_prices: Dict[Tuple[str, str], Dict] = {}
+        if not pairs:
+            return cached_prices
+        
+        # Try Redis first, all keys in one round trip
+        try:
+            cache_keys = [f"price:{material_name}:{unit}" for material_name, unit in pairs]
+            for pair, cached in zip(pairs, await self.redis_client.mget(cache_keys)):
                 if cached:
-                    return pickle.loads(cached)
-            except Exception as e:
-                logger.warning(f"Redis get error: {str(e)}")
+                    price = self._decode_cached_price(cached)
+                    if price:
+                        cached_prices[pair] = price
+        except redis.RedisError as e:
+            logger.warning(f"Redis get error: {str(e)}")
         
-        # Try database cache
-        cache_entry = self.db.query(PriceCache).filter(
-            PriceCache.material_name == material_name,
-            PriceCache.unit == unit,
+        # Try database cache for the remaining pairs in one query
+        misses = [pair for pair in pairs if pair not in cached_prices]
+        if not misses:
+            return cached_prices
+        
+        cache_entries = self.db.query(PriceCache).filter(
+            tuple_(PriceCache.material_name, PriceCache.unit).in_(misses),
             PriceCache.valid_until > datetime.now()
-        ).order_by(PriceCache.fetched_at.desc()).first()
+        ).order_by(PriceCache.fetched_at.desc()).all()
         
-        if cache_entry:
-            cache_entry.cache_hits += 1
-            cache_entry.last_accessed = datetime.now()
-            self.db.commit()
-            
-            return {
+        hit_ids = []
+        for cache_entry in cache_entries:
+            pair = (cache_entry.material_name, cache_entry.unit)
+            if pair in cached_prices:
+                # Newest entry per pair comes first
+                continue
+            hit_ids.append(cache_entry.id)
+            cached_prices[pair] = {
                 'unit_rate': cache_entry.unit_rate,
                 'source': cache_entry.source,
                 'source_reference': cache_entry.source_reference,
                 'fetched_at': cache_entry.fetched_at
             }
         
-        return None
+        # Bump hit counters in one UPDATE, committed on its own
+        if hit_ids:
+            await asyncio.to_thread(self._record_cache_hits, hit_ids)
+        
+        return cached_prices
+    
+    @staticmethod
+    def _record_cache_hits(hit_ids: List[int]):
+        """Increment hit counters in a short transaction of their own"""
+        # A separate session keeps the row locks out of the caller's long
+        # analysis transaction; sorted ids give every worker the same lock order
+        try:
+            with SessionLocal() as session, session.begin():
+                session.execute(
+                    update(PriceCache)
+                    .where(PriceCache.id.in_(sorted(hit_ids)))
+                    .values(cache_hits=PriceCache.cache_hits + 1, last_accessed=func.now())
+                    .execution_options(synchronize_session=False)
+                )
+        except Exception as e:
+            logger.warning(f"Could not record price cache hits: {str(e)}")
+    
+    @staticmethod
+    def _decode_cached_price(cached: bytes) -> Optional[Dict]:
+        """Decode a Redis price entry; undecodable entries count as misses"""
+        try:
+            price = orjson.loads(cached)
+            price['fetched_at'] = datetime.fromisoformat(price['fetched_at'])
+            return price
+        except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+            return None
     
     async def _fetch_price_from_sources(
         self, 
@@ -286,9 +512,10 @@ class PricingService:
     ) -> Optional[Dict]:
         """Fetch price from government sources"""
         
-        # Check material database first
-        material_info = self.material_database.get(material_name)
-        if material_info:
+        # Check material database first (exact names count as CPWD SOR rates)
+        match = self._lookup_material(material_name)
+        if match and match[2]:
+            material_info = match[1]
             return {
                 'unit_rate': material_info['typical_rate'],
                 'source': 'CPWD_SOR',
@@ -315,14 +542,13 @@ class PricingService:
             logger.info(f"Attempting to fetch {material_name} from CPWD SOR")
             
             # Simulate API response
-            # async with httpx.AsyncClient() as client:
-            #     response = await client.get(
-            #         f"{settings.CPWD_SOR_API_URL}/search",
-            #         params={'material': material_name, 'unit': unit}
-            #     )
-            #     if response.status_code == 200:
-            #         data = response.json()
-            #         return data
+            # response = await self.http_client.get(
+            #     f"{settings.CPWD_SOR_API_URL}/search",
+            #     params={'material': material_name, 'unit': unit}
+            # )
+            # if response.status_code == 200:
+            #     data = response.json()
+            #     return data
             
             return None
         
@@ -336,15 +562,14 @@ class PricingService:
             logger.info(f"Attempting to fetch {material_name} from GeM")
             
             # In production, make actual API call with authentication
-            # async with httpx.AsyncClient() as client:
-            #     response = await client.get(
-            #         f"{settings.GEM_API_URL}/products/search",
-            #         headers={'Authorization': f'Bearer {settings.GEM_API_KEY}'},
-            #         params={'query': material_name}
-            #     )
-            #     if response.status_code == 200:
-            #         data = response.json()
-            #         return data
+            # response = await self.http_client.get(
+            #     f"{settings.GEM_API_URL}/products/search",
+            #     headers={'Authorization': f'Bearer {settings.GEM_API_KEY}'},
+            #     params={'query': material_name}
+            # )
+            # if response.status_code == 200:
+            #     data = response.json()
+            #     return data
             
             return None
         
@@ -360,19 +585,11 @@ class PricingService:
     ) -> Dict[str, Any]:
         """Get fallback price from material database"""
         
-        # Try exact match
-        material_info = self.material_database.get(material_name)
+        # Exact, case-insensitive or fuzzy match (shared with _fetch_price_from_sources)
+        match = self._lookup_material(material_name)
         
-        # Try fuzzy match
-        if not material_info:
-            material_name_lower = material_name.lower()
-            for mat_name, mat_info in self.material_database.items():
-                if material_name_lower in mat_name.lower() or mat_name.lower() in material_name_lower:
-                    material_info = mat_info
-                    material_name = mat_name
-                    break
-        
-        if material_info:
+        if match:
+            material_name, material_info, _ = match
             unit_rate = material_info['typical_rate']
             return {
                 'material_name': material_name,
@@ -404,41 +621,69 @@ class PricingService:
             'requires_verification': True
         }
     
-    async def _cache_price(self, material_name: str, unit: str, price_data: Dict):
-        """Cache price in Redis and database"""
+    async def _cache_prices(self, prices: Dict[Tuple[str, str], Dict]):
+        """Cache prices in Redis and database under already normalized keys"""
+        if not prices:
+            return
+        
+        now = datetime.now()
         
-        # Cache in Redis
-        if self.redis_client:
-            try:
-                cache_key = f"price:{material_name}:{unit}"
+        # Cache in Redis: one pipelined round trip for the whole batch
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for (material_name, unit), price_data in prices.items():
                 cache_data = {
                     'unit_rate': price_data['unit_rate'],
                     'source': price_data['source'],
                     'source_reference': price_data.get('reference', ''),
-                    'fetched_at': datetime.now()
+                    'fetched_at': now
                 }
-                self.redis_client.setex(
-                    cache_key,
+                pipe.setex(
+                    f"price:{material_name}:{unit}",
                     settings.REDIS_CACHE_TTL,
-                    pickle.dumps(cache_data)
+                    orjson.dumps(cache_data)
                 )
-            except Exception as e:
-                logger.warning(f"Redis cache error: {str(e)}")
+            await pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Redis cache error: {str(e)}")
         
-        # Cache in database
+        # Cache in database: one multi-row upsert, one row per material/unit,
+        # sorted so concurrent workers lock rows in the same order
+        rows = [
+            {
+                'material_name': material_name,
+                'unit': unit,
+                'unit_rate': price_data['unit_rate'],
+                'source': price_data['source'],
+                'source_reference': price_data.get('reference', ''),
+                'valid_from': now,
+                'valid_until': now + timedelta(days=90),
+                'fetched_at': now
+            }
+            for (material_name, unit), price_data in sorted(prices.items())
+        ]
+        await asyncio.to_thread(self._upsert_cached_prices, rows)
+    
+    @staticmethod
+    def _upsert_cached_prices(rows: List[Dict[str, Any]]):
+        """Upsert price rows in a short transaction of their own"""
+        # Committed independently of the caller's session, so a failed or
+        # blocked upsert never holds locks in or aborts the analysis transaction
         try:
-            cache_entry = PriceCache(
-                material_name=material_name,
-                unit=unit,
-                unit_rate=price_data['unit_rate'],
-                source=price_data['source'],
-                source_reference=price_data.get('reference', ''),
-                valid_from=datetime.now(),
-                valid_until=datetime.now() + timedelta(days=90),
-                fetched_at=datetime.now()
+            stmt = pg_insert(PriceCache).values(rows)
+            stmt = stmt.on_conflict_do_update(
+                constraint="uq_price_cache_material_unit",
+                set_={
+                    'unit_rate': stmt.excluded.unit_rate,
+                    'source': stmt.excluded.source,
+                    'source_reference': stmt.excluded.source_reference,
+                    'valid_from': stmt.excluded.valid_from,
+                    'valid_until': stmt.excluded.valid_until,
+                    'fetched_at': stmt.excluded.fetched_at,
+                    'updated_at': func.now()
+                }
             )
-            self.db.add(cache_entry)
-            self.db.commit()
+            with SessionLocal() as session, session.begin():
+                session.execute(stmt)
         except Exception as e:
             logger.error(f"Database cache error: {str(e)}")
-            self.db.rollback()
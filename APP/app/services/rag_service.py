@@ -2,55 +2,69 @@
 RAG (Retrieval-Augmented Generation) Service for IRC Standards
 Implements vector search and semantic matching
 """
+import asyncio
+import hashlib
 import logging
-from typing import List, Dict, Any, Optional
-import chromadb
-from chromadb.config import Settings as ChromaSettings
+import os
+from typing import TYPE_CHECKING, List, Dict, Any, Mapping, Optional, Sequence, Tuple
 from pathlib import Path
 import json
+import numpy as np
 
 from app.core.config import settings
+from app.services.irc_data import (
+    IRC_DOCUMENTS,
+    IRC_IDS,
+    IRC_KEYWORD_INDEX,
+    IRC_METADATAS,
+    IRC_STANDARDS,
+)
+from app.utils.semantic_cache import SemanticCache
+
+if TYPE_CHECKING:
+    from app.services.ai_service import AIService
 
 logger = logging.getLogger(__name__)
 
+# Normalized query strings remembered by RAGService's exact-match cache
+EXACT_CACHE_SIZE = 1024
+
+# Damping constant for reciprocal rank fusion in find_relevant_standards
+RRF_K = 60
+
 
 class RAGService:
     """RAG service for IRC standards retrieval"""
     
-    def __init__(self):
-        self.client = None
-        self.collection = None
-        self.irc_standards_db = {}
+    def __init__(self, embedder: "AIService"):
+        self.irc_standards_db: Dict[str, Mapping[str, Any]] = {}
+        
+        # The corpus is a few dozen documents, so search is an exact inner
+        # product over an in-memory matrix of L2-normalized embeddings
+        self.embedder = embedder
+        self._embeddings: Optional[np.ndarray] = None
+        self._metadatas: Sequence[Dict[str, Any]] = ()
+        self._index_path: Optional[Path] = None
+        
+        # applications keyword -> standard codes, for search_by_keyword
+        self._kw_index: Dict[str, List[str]] = {}
+        
+        # Repeated queries hit the exact cache (normalized text); near-duplicates
+        # fall through to the semantic cache, one per top_k
+        self._exact_cache: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
+        self._semantic_caches: Dict[int, SemanticCache] = {}
         
     async def initialize(self):
-        """Initialize ChromaDB and load IRC standards"""
+        """Load IRC standards and their embeddings"""
         try:
             logger.info("Initializing RAG service...")
             
-            # Create ChromaDB client
             persist_dir = Path(settings.CHROMA_PERSIST_DIRECTORY)
             persist_dir.mkdir(parents=True, exist_ok=True)
+            self._index_path = persist_dir / f"{settings.VECTOR_COLLECTION_NAME}.npz"
             
-            self.client = chromadb.Client(ChromaSettings(
-                chroma_db_impl="duckdb+parquet",
-                persist_directory=str(persist_dir)
-            ))
-            
-            # Get or create collection
-            try:
-                self.collection = self.client.get_collection(
-                    name=settings.VECTOR_COLLECTION_NAME
-                )
-                logger.info(f"Loaded existing collection: {settings.VECTOR_COLLECTION_NAME}")
-            except:
-                self.collection = self.client.create_collection(
-                    name=settings.VECTOR_COLLECTION_NAME,
-                    metadata={"description": "IRC Standards for Road Safety"}
-                )
-                logger.info(f"Created new collection: {settings.VECTOR_COLLECTION_NAME}")
-                
-                # Load and index IRC standards
-                await self._load_irc_standards()
+            # Load and index IRC standards
+            await self._load_irc_standards()
             
             logger.info("RAG service initialized successfully")
         
@@ -60,163 +74,71 @@ class RAGService:
     
     async def cleanup(self):
         """Cleanup resources"""
-        if self.client:
-            self.client.persist()
-        self.client = None
-        self.collection = None
+        self._embeddings = None
+        self._metadatas = ()
+        self._kw_index = {}
+        self._exact_cache.clear()
+        self._semantic_caches.clear()
     
     async def _load_irc_standards(self):
         """Load IRC standards into vector database"""
         logger.info("Loading IRC standards...")
         
-        # IRC Standards data (in production, load from files/database)
-        irc_standards = [
-            {
-                'code': 'IRC 35',
-                'title': 'Code of Practice for Road Markings',
-                'description': 'Covers specifications for road markings including pavement markings, object markers, delineators, and hazard markers. Specifies materials, colors, dimensions, and retroreflectivity requirements.',
-                'clauses': {
-                    '4.1': 'White and yellow thermoplastic paint for road markings',
-                    '4.2': 'Retroreflective road studs and cat eyes',
-                    '5.1': 'Center line markings specifications',
-                    '5.2': 'Edge line markings',
-                    '6.1': 'Pedestrian crossing markings (zebra crossings)',
-                    '7.1': 'Stop lines and give way markings'
-                },
-                'applications': ['road marking', 'pavement marking', 'line marking', 'pedestrian crossing', 'zebra crossing']
-            },
-            {
-                'code': 'IRC 67',
-                'title': 'Code of Practice for Road Signs',
-                'description': 'Guidelines for design, placement, and specifications of road traffic signs including regulatory, warning, and informatory signs. Covers materials, reflectivity, and mounting requirements.',
-                'clauses': {
-                    '4.1': 'Regulatory signs (mandatory, prohibitory)',
-                    '4.2': 'Warning signs for hazards',
-                    '4.3': 'Informatory signs (route guidance)',
-                    '5.1': 'Sign dimensions and letter sizes',
-                    '6.1': 'Retroreflective sheeting specifications',
-                    '7.1': 'Sign placement and mounting heights'
-                },
-                'applications': ['traffic sign', 'warning sign', 'mandatory sign', 'regulatory sign', 'guide sign', 'signage']
-            },
-            {
-                'code': 'IRC 99',
-                'title': 'Tentative Guidelines on the Provision of Facilities for Pedestrians',
-                'description': 'Guidelines for pedestrian infrastructure including footpaths, crossings, overpasses, underpasses, and pedestrian safety measures.',
-                'clauses': {
-                    '5.1': 'Footpath width and design requirements',
-                    '5.2': 'Surface requirements for footpaths',
-                    '6.1': 'At-grade pedestrian crossings',
-                    '6.2': 'Pedestrian signals and refuge islands',
-                    '7.1': 'Pedestrian overpasses and underpasses',
-                    '8.1': 'Ramps and tactile paving for accessibility'
-                },
-                'applications': ['footpath', 'footway', 'sidewalk', 'pedestrian crossing', 'pedestrian facility']
-            },
-            {
-                'code': 'IRC SP:84',
-                'title': 'Manual for Road Safety Audits',
-                'description': 'Comprehensive manual for conducting road safety audits at all stages of road projects. Covers audit procedures, safety checkpoints, and intervention recommendations.',
-                'clauses': {
-                    '4.1': 'Safety audit at feasibility stage',
-                    '4.2': 'Safety audit at design stage',
-                    '5.1': 'Pre-opening safety audit',
-                    '6.1': 'Road safety inspections',
-                    '7.1': 'Black spot identification and treatment',
-                    '8.1': 'Safety interventions and countermeasures'
-                },
-                'applications': ['safety audit', 'black spot', 'hazard', 'safety intervention', 'crash analysis']
-            },
-            {
-                'code': 'IRC SP:87',
-                'title': 'Manual of Specifications and Standards for Four Laning of Highways',
-                'description': 'Standards for widening and upgrading highways to four lanes, including safety features, barriers, medians, and auxiliary facilities.',
-                'clauses': {
-                    '8.1': 'Median design and barriers',
-                    '8.2': 'Crash barriers and guardrails',
-                    '9.1': 'Road furniture and safety appurtenances',
-                    '10.1': 'Street lighting and illumination',
-                    '11.1': 'Traffic signs and road markings',
-                    '12.1': 'Drainage and road safety'
-                },
-                'applications': ['median', 'crash barrier', 'guardrail', 'safety barrier', 'illumination', 'street light']
-            },
-            {
-                'code': 'IRC 19',
-                'title': 'Geometric Design Standards for Rural (Non-Urban) Highways',
-                'description': 'Standards for geometric design including alignment, cross-section, sight distance, and safety features for rural highways.',
-                'clauses': {
-                    '7.1': 'Road shoulder specifications',
-                    '7.2': 'Roadside safety and clear zones',
-                    '8.1': 'Horizontal and vertical curves',
-                    '9.1': 'Sight distance requirements',
-                    '10.1': 'Junction and intersection design'
-                },
-                'applications': ['shoulder', 'verge', 'alignment', 'junction', 'intersection', 'roundabout']
-            },
-            {
-                'code': 'IRC 103',
-                'title': 'Guidelines for Pedestrian Facilities',
-                'description': 'Detailed guidelines for providing safe pedestrian facilities including walkways, crossings, and grade-separated facilities.',
-                'clauses': {
-                    '4.1': 'Pedestrian facility planning',
-                    '5.1': 'Footpath design standards',
-                    '6.1': 'At-grade crossing design',
-                    '7.1': 'Grade-separated crossings'
-                },
-                'applications': ['pedestrian', 'footpath', 'crossing', 'walkway']
-            },
-            {
-                'code': 'IRC 11',
-                'title': 'Recommended Practice for the Design of At-Grade Extra-Urban Intersections',
-                'description': 'Design guidelines for intersections including channelization, traffic islands, and safety measures.',
-                'clauses': {
-                    '5.1': 'Intersection types and selection',
-                    '6.1': 'Channelization design',
-                    '7.1': 'Traffic islands and medians',
-                    '8.1': 'Sight distance at intersections'
-                },
-                'applications': ['intersection', 'junction', 'channelization', 'traffic island']
-            }
-        ]
+        self.irc_standards_db = {std['code']: std for std in IRC_STANDARDS}
         
-        # Prepare documents for indexing
-        documents = []
-        metadatas = []
-        ids = []
+        # Reuse persisted embeddings when the corpus and model are unchanged
+        corpus_hash = self._corpus_hash(IRC_IDS, IRC_DOCUMENTS)
+        embeddings = await asyncio.to_thread(self._load_index, corpus_hash)
+        if embeddings is None:
+            # Embed every document in one batched pass
+            embeddings = np.asarray(await self.embedder.generate_embeddings(list(IRC_DOCUMENTS)), dtype=np.float32)
+            await asyncio.to_thread(self._save_index, corpus_hash, embeddings)
+            logger.info(f"Indexed {len(IRC_DOCUMENTS)} IRC standard documents")
+        else:
+            logger.info(f"Loaded {len(IRC_DOCUMENTS)} IRC standard embeddings from {self._index_path}")
         
-        for std in irc_standards:
-            self.irc_standards_db[std['code']] = std
-            
-            # Main standard document
-            doc_text = f"{std['code']}: {std['title']}\n{std['description']}"
-            documents.append(doc_text)
-            metadatas.append({
-                'code': std['code'],
-                'title': std['title'],
-                'type': 'standard'
-            })
-            ids.append(std['code'])
-            
-            # Index individual clauses
-            for clause_num, clause_text in std.get('clauses', {}).items():
-                clause_doc = f"{std['code']} Clause {clause_num}: {clause_text}"
-                documents.append(clause_doc)
-                metadatas.append({
-                    'code': std['code'],
-                    'clause': clause_num,
-                    'type': 'clause'
-                })
-                ids.append(f"{std['code']}_clause_{clause_num}")
-        
-        # Add to collection
-        if documents:
-            self.collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            logger.info(f"Indexed {len(documents)} IRC standard documents")
+        self._embeddings = embeddings
+        self._metadatas = IRC_METADATAS
+        self._kw_index = IRC_KEYWORD_INDEX
+    
+    @staticmethod
+    def _corpus_hash(ids: Sequence[str], documents: Sequence[str]) -> str:
+        """SHA256 over the embedding model and every indexed document"""
+        sha256_hash = hashlib.sha256(settings.TRANSFORMER_MODEL.encode("utf-8"))
+        for doc_id, document in zip(ids, documents):
+            sha256_hash.update(b"\0" + doc_id.encode("utf-8") + b"\0" + document.encode("utf-8"))
+        return sha256_hash.hexdigest()
+    
+    def _load_index(self, corpus_hash: str) -> Optional[np.ndarray]:
+        try:
+            with np.load(self._index_path) as data:
+                if str(data["corpus_hash"]) != corpus_hash:
+                    return None
+                return data["embeddings"].astype(np.float32, copy=False)
+        except (OSError, KeyError, ValueError):
+            return None
+    
+    def _save_index(self, corpus_hash: str, embeddings: np.ndarray):
+        # Prefork workers start together; write aside and rename so readers
+        # only ever see a complete file
+        tmp_path = self._index_path.with_name(f"{self._index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "wb") as f:
+                np.savez(f, corpus_hash=np.array(corpus_hash), embeddings=embeddings)
+            os.replace(tmp_path, self._index_path)
+        except OSError as e:
+            logger.warning(f"Could not persist IRC index: {str(e)}")
+            tmp_path.unlink(missing_ok=True)
+    
+    def _search(self, query_vector: np.ndarray, n_results: int) -> List[Tuple[Dict[str, Any], float]]:
+        """Best n_results documents by cosine similarity, highest first"""
+        if self._embeddings is None or not len(self._embeddings):
+            return []
+        scores = self._embeddings @ query_vector
+        n_results = min(n_results, len(scores))
+        top = np.argpartition(-scores, n_results - 1)[:n_results]
+        top = top[np.argsort(-scores[top])]
+        return [(self._metadatas[i], float(scores[i])) for i in top]
     
     async def find_relevant_standards(
         self, 
@@ -238,36 +160,61 @@ class RAGService:
             if not query:
                 return []
             
-            # Search in ChromaDB
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=top_k * 2  # Get more results to filter
-            )
+            # Serve repeated queries without embedding them
+            exact_key = (top_k, ' '.join(query.lower().split()))
+            cached = self._exact_cache.get(exact_key)
+            if cached is not None:
+                return [dict(std) for std in cached]
+            
+            # Embed the combined query and each field in one batched call
+            query_texts = list(dict.fromkeys([query, *(p.strip() for p in query_parts if p and p.strip())]))
+            query_vectors = np.asarray(await self.embedder.generate_embeddings(query_texts), dtype=np.float32)
+            query_vector = query_vectors[0]
+            
+            # Serve semantically duplicate queries from the cache
+            if settings.SEMANTIC_CACHE_SIZE > 0:
+                cached = self._semantic_cache(top_k, query_vector.shape[0]).get(query_vector)
+                if cached is not None:
+                    self._remember_exact(exact_key, cached)
+                    return [dict(std) for std in cached]
+            
+            # Search once per query text and fuse the rankings by reciprocal rank,
+            # so a standard matching one field strongly is not drowned out
+            fused_scores: Dict[str, float] = {}
+            best_hits: Dict[str, Tuple[Dict[str, Any], float]] = {}
+            
+            for vector in query_vectors:
+                ranked_codes = []
+                for metadata, score in self._search(vector, top_k * 2):  # Get more results to filter
+                    code = metadata.get('code')
+                    if not code:
+                        continue
+                    if code not in ranked_codes:
+                        ranked_codes.append(code)
+                    if code not in best_hits or score > best_hits[code][1]:
+                        best_hits[code] = (metadata, score)
+                
+                for rank, code in enumerate(ranked_codes, start=1):
+                    fused_scores[code] = fused_scores.get(code, 0.0) + 1.0 / (RRF_K + rank)
             
             # Process results
             relevant_standards = []
-            seen_codes = set()
+            for code in sorted(fused_scores, key=fused_scores.get, reverse=True)[:top_k]:
+                metadata, score = best_hits[code]
+                standard_info = self.irc_standards_db.get(code, {})
+                relevant_standards.append({
+                    'code': code,
+                    'title': standard_info.get('title', ''),
+                    'description': standard_info.get('description', ''),
+                    'relevance_score': max(score, 0.0),
+                    'matched_clause': metadata.get('clause')
+                })
             
-            if results and results['ids'] and len(results['ids']) > 0:
-                for i, doc_id in enumerate(results['ids'][0]):
-                    metadata = results['metadatas'][0][i]
-                    distance = results['distances'][0][i] if 'distances' in results else 1.0
-                    
-                    code = metadata.get('code')
-                    if code and code not in seen_codes:
-                        seen_codes.add(code)
-                        
-                        standard_info = self.irc_standards_db.get(code, {})
-                        relevant_standards.append({
-                            'code': code,
-                            'title': standard_info.get('title', ''),
-                            'description': standard_info.get('description', ''),
-                            'relevance_score': 1.0 - min(distance, 1.0),
-                            'matched_clause': metadata.get('clause')
-                        })
-                        
-                        if len(relevant_standards) >= top_k:
-                            break
+            if settings.SEMANTIC_CACHE_SIZE > 0:
+                self._semantic_cache(top_k, query_vector.shape[0]).put(
+                    query_vector, [dict(std) for std in relevant_standards]
+                )
+            self._remember_exact(exact_key, [dict(std) for std in relevant_standards])
             
             return relevant_standards
         
@@ -275,31 +222,56 @@ class RAGService:
             logger.error(f"Error finding relevant standards: {str(e)}", exc_info=True)
             return []
     
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """L2-normalized query embedding"""
+        embeddings = await self.embedder.generate_embeddings([query])
+        return np.asarray(embeddings[0], dtype=np.float32)
+    
+    def _remember_exact(self, key: Tuple[int, str], standards: List[Dict[str, Any]]):
+        # Oldest entry evicted first
+        if key not in self._exact_cache and len(self._exact_cache) >= EXACT_CACHE_SIZE:
+            del self._exact_cache[next(iter(self._exact_cache))]
+        self._exact_cache[key] = standards
+    
+    def _semantic_cache(self, top_k: int, dim: int) -> SemanticCache:
+        cache = self._semantic_caches.get(top_k)
+        if cache is None:
+            cache = SemanticCache(
+                dim,
+                capacity=settings.SEMANTIC_CACHE_SIZE,
+                threshold=settings.SEMANTIC_CACHE_THRESHOLD
+            )
+            self._semantic_caches[top_k] = cache
+        return cache
+    
     async def get_standard_details(self, code: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific IRC standard"""
-        return self.irc_standards_db.get(code)
+        # Copies, so callers cannot reach the shared read-only reference data
+        standard = self.irc_standards_db.get(code)
+        return dict(standard) if standard is not None else None
     
     async def search_by_keyword(self, keyword: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Search standards by keyword"""
         try:
-            results = self.collection.query(
-                query_texts=[keyword],
-                n_results=top_k
-            )
+            # applications keywords are a controlled vocabulary; only unknown
+            # keywords need a vector search
+            codes = self._kw_index.get(keyword.lower().strip())
+            if codes:
+                return [dict(self.irc_standards_db[code]) for code in codes[:top_k]]
+            
+            query_vector = await self._embed_query(keyword)
             
             standards = []
             seen = set()
             
-            if results and results['ids'] and len(results['ids']) > 0:
-                for i, doc_id in enumerate(results['ids'][0]):
-                    metadata = results['metadatas'][0][i]
-                    code = metadata.get('code')
-                    
-                    if code and code not in seen:
-                        seen.add(code)
-                        standard_info = self.irc_standards_db.get(code, {})
-                        if standard_info:
-                            standards.append(standard_info)
+            for metadata, _ in self._search(query_vector, top_k):
+                code = metadata.get('code')
+                
+                if code and code not in seen:
+                    seen.add(code)
+                    standard_info = self.irc_standards_db.get(code, {})
+                    if standard_info:
+                        standards.append(dict(standard_info))
             
             return standards
         
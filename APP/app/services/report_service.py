@@ -1,18 +1,155 @@
 """Report generation service using Jinja2 + WeasyPrint."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
 from weasyprint import HTML, CSS
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Lightweight government-style palette
+DEFAULT_CSS = """
+    @page {
+        size: A4;
+        margin: 1.2cm;
+    }
+
+    body {
+        font-family: 'Inter', 'Noto Sans', 'Segoe UI', sans-serif;
+        color: #1b263b;
+        background: #ffffff;
+        font-size: 12px;
+    }
+
+    header {
+        border-bottom: 2px solid #0a3161;
+        padding-bottom: 12px;
+        margin-bottom: 18px;
+        display: flex;
+        align-items: center;
+        gap: 16px;
+    }
+
+    header img {
+        width: 48px;
+        height: 48px;
+    }
+
+    h1 {
+        font-size: 20px;
+        color: #0a3161;
+        margin: 0;
+    }
+
+    h2 {
+        font-size: 16px;
+        color: #0a3161;
+        border-bottom: 1px solid #dfe7f5;
+        padding-bottom: 6px;
+        margin-top: 24px;
+    }
+
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 12px 0;
+        font-size: 11px;
+    }
+
+    table th {
+        background: #f1f5fb;
+        color: #0a3161;
+        text-align: left;
+        padding: 8px;
+        border-bottom: 1px solid #c7d3eb;
+    }
+
+    table td {
+        padding: 8px;
+        border-bottom: 1px solid #e1e7f1;
+    }
+
+    .pill {
+        display: inline-block;
+        padding: 2px 8px;
+        background: #e7ecf8;
+        color: #0a3161;
+        border-radius: 12px;
+        font-size: 10px;
+        margin-right: 4px;
+    }
+
+    .summary-grid {
+        display: grid;
+        grid-template-columns: repeat(2, 1fr);
+        gap: 12px;
+        margin-top: 12px;
+    }
+
+    .summary-card {
+        background: #f9fafc;
+        border: 1px solid #e0e6f2;
+        border-radius: 8px;
+        padding: 10px 12px;
+    }
+
+    .summary-card .label {
+        font-size: 10px;
+        text-transform: uppercase;
+        color: #5c6f91;
+        letter-spacing: 0.05em;
+    }
+
+    .summary-card .value {
+        font-size: 16px;
+        font-weight: 600;
+        margin-top: 4px;
+        color: #0f1d3d;
+    }
+
+    .alert {
+        border-left: 3px solid #c44536;
+        background: #fff5f4;
+        padding: 8px 12px;
+        margin: 8px 0;
+        border-radius: 4px;
+    }
+"""
+
+REPORT_TEMPLATE_NAME = "report.html"
+
+# A ReportService is built per analysis, so the Jinja environment, template and
+# parsed stylesheet are kept per process and shared by every instance
+_env: Optional[Environment] = None
+_template: Optional[Template] = None
+_css: Optional[CSS] = None
+
+
+def _report_assets(template_dir: Path) -> Tuple[Environment, Template, CSS]:
+    """Build the report environment, template and stylesheet on first use"""
+    global _env, _template, _css
+    if _env is None:
+        env = Environment(
+            loader=FileSystemLoader(str(template_dir)),
+            autoescape=select_autoescape(["html", "xml"]),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            # One template; only re-stat it for edits while developing
+            cache_size=-1,
+            auto_reload=settings.DEBUG,
+        )
+        _template = env.get_template(REPORT_TEMPLATE_NAME)
+        _css = CSS(string=DEFAULT_CSS)
+        _env = env
+    return _env, _template, _css
+
 
 class ReportService:
     """Generate professional audit-ready reports."""
@@ -23,14 +160,8 @@ class ReportService:
         self.output_dir = Path(settings.REPORT_OUTPUT_DIR)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        self.env = Environment(
-            loader=FileSystemLoader(str(self.template_dir)),
-            autoescape=select_autoescape(["html", "xml"]),
-            trim_blocks=True,
-            lstrip_blocks=True,
-        )
-
-        self.template_name = "report.html"
+        self.template_name = REPORT_TEMPLATE_NAME
+        self.env, self.template, self._css = _report_assets(self.template_dir)
 
     async def generate_report(
         self,
@@ -43,25 +174,32 @@ class ReportService:
         """Render HTML template and export as PDF."""
 
         context = self._build_context(document, interventions, total_cost, analysis)
-        template = self.env.get_template(self.template_name)
-        rendered_html = template.render(**context)
+        if settings.DEBUG:
+            self.template = self.env.get_template(self.template_name)
+        rendered_html = self.template.render(context)
 
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
         base_filename = f"report_document_{document_id}_{timestamp}"
-        html_path = self.output_dir / f"{base_filename}.html"
         pdf_path = self.output_dir / f"{base_filename}.pdf"
 
-        html_path.write_text(rendered_html, encoding="utf-8")
+        # The rendered HTML is only kept for debugging templates
+        if settings.DEBUG:
+            html_path = self.output_dir / f"{base_filename}.html"
+            await asyncio.to_thread(html_path.write_text, rendered_html, encoding="utf-8")
 
-        css = CSS(string=self._default_css())
-        HTML(string=rendered_html, base_url=str(self.template_dir.parent)).write_pdf(
-            str(pdf_path),
-            stylesheets=[css],
-        )
+        # Layout takes seconds on long reports; keep it off the event loop
+        await asyncio.to_thread(self._render_pdf, rendered_html, pdf_path)
 
         logger.info("Report generated at %s", pdf_path)
         return str(pdf_path)
 
+    def _render_pdf(self, rendered_html: str, pdf_path: Path) -> None:
+        # write_pdf() without a target returns the document, written in one go
+        pdf_bytes = HTML(string=rendered_html, base_url=str(self.template_dir.parent)).write_pdf(
+            stylesheets=[self._css],
+        )
+        pdf_path.write_bytes(pdf_bytes)
+
     def _build_context(
         self,
         document,
@@ -73,23 +211,10 @@ class ReportService:
 
         cost_breakdown = []
         for intervention in interventions:
-            materials = []
-            subtotal = 0.0
-            for item in intervention.cost_items:
-                materials.append(
-                    {
-                        "material_name": item.material_name,
-                        "specification": item.specification,
-                        "quantity": item.quantity,
-                        "unit": item.unit,
-                        "unit_rate": item.unit_rate,
-                        "total_cost": item.total_cost,
-                        "source": item.price_source,
-                        "reference": item.price_source_reference,
-                        "fetched_at": item.price_fetched_at,
-                    }
-                )
-                subtotal += item.total_cost
+            # cost_items are eager-loaded with the interventions; the template
+            # reads the ORM rows directly and the subtotal is summed in memory
+            cost_items = intervention.cost_items
+            subtotal = float(sum(item.total_cost for item in cost_items))
 
             cost_breakdown.append(
                 {
@@ -101,7 +226,7 @@ class ReportService:
                     "irc_clauses": intervention.irc_clauses or [],
                     "specifications": intervention.specifications or {},
                     "confidence_score": intervention.confidence_score,
-                    "materials": materials,
+                    "materials": cost_items,
                     "subtotal": subtotal,
                 }
             )
@@ -148,114 +273,3 @@ class ReportService:
         }
 
         return context
-
-    def _default_css(self) -> str:
-        """Lightweight government-style palette."""
-
-        return """
-            @page {
-                size: A4;
-                margin: 1.2cm;
-            }
-
-            body {
-                font-family: 'Inter', 'Noto Sans', 'Segoe UI', sans-serif;
-                color: #1b263b;
-                background: #ffffff;
-                font-size: 12px;
-            }
-
-            header {
-                border-bottom: 2px solid #0a3161;
-                padding-bottom: 12px;
-                margin-bottom: 18px;
-                display: flex;
-                align-items: center;
-                gap: 16px;
-            }
-
-            header img {
-                width: 48px;
-                height: 48px;
-            }
-
-            h1 {
-                font-size: 20px;
-                color: #0a3161;
-                margin: 0;
-            }
-
-            h2 {
-                font-size: 16px;
-                color: #0a3161;
-                border-bottom: 1px solid #dfe7f5;
-                padding-bottom: 6px;
-                margin-top: 24px;
-            }
-
-            table {
-                width: 100%;
-                border-collapse: collapse;
-                margin: 12px 0;
-                font-size: 11px;
-            }
-
-            table th {
-                background: #f1f5fb;
-                color: #0a3161;
-                text-align: left;
-                padding: 8px;
-                border-bottom: 1px solid #c7d3eb;
-            }
-
-            table td {
-                padding: 8px;
-                border-bottom: 1px solid #e1e7f1;
-            }
-
-            .pill {
-                display: inline-block;
-                padding: 2px 8px;
-                background: #e7ecf8;
-                color: #0a3161;
-                border-radius: 12px;
-                font-size: 10px;
-                margin-right: 4px;
-            }
-
-            .summary-grid {
-                display: grid;
-                grid-template-columns: repeat(2, 1fr);
-                gap: 12px;
-                margin-top: 12px;
-            }
-
-            .summary-card {
-                background: #f9fafc;
-                border: 1px solid #e0e6f2;
-                border-radius: 8px;
-                padding: 10px 12px;
-            }
-
-            .summary-card .label {
-                font-size: 10px;
-                text-transform: uppercase;
-                color: #5c6f91;
-                letter-spacing: 0.05em;
-            }
-
-            .summary-card .value {
-                font-size: 16px;
-                font-weight: 600;
-                margin-top: 4px;
-                color: #0f1d3d;
-            }
-
-            .alert {
-                border-left: 3px solid #c44536;
-                background: #fff5f4;
-                padding: 8px 12px;
-                margin: 8px 0;
-                border-radius: 4px;
-            }
-        """
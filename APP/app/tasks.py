@@ -0,0 +1,209 @@
+"""
+Celery task queue for document analysis
+Runs the AI/RAG pipeline in dedicated worker processes instead of the API workers
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from celery import Celery
+from celery.signals import setup_logging as celery_setup_logging
+from celery.signals import worker_process_init, worker_process_shutdown
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.db.database import ScopedSession
+from app.db.models import DocumentStatus
+from app.services.document_service import DocumentService
+
+logger = logging.getLogger(__name__)
+
+celery_app = Celery(
+    "analyses",
+    broker=settings.REDIS_URL,
+    backend=settings.REDIS_URL
+)
+celery_app.conf.update(
+    task_serializer="json",
+    accept_content=["json"],
+    task_ignore_result=True,
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+)
+
+
+class WorkerState:
+    """AI services and event loop owned by a single worker process"""
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.ai_service = None
+        self.rag_service = None
+
+    @property
+    def ready(self) -> bool:
+        return self.loop is not None
+
+    def initialize(self):
+        """Load AI models once per worker process"""
+        from app.services.ai_service import AIService
+        from app.services.rag_service import RAGService
+
+        logger.info("Initializing AI services for worker process...")
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+        self.ai_service = AIService()
+        self.loop.run_until_complete(self.ai_service.initialize())
+
+        self.rag_service = RAGService(embedder=self.ai_service)
+        self.loop.run_until_complete(self.rag_service.initialize())
+        logger.info("Worker AI services ready")
+
+    def cleanup(self):
+        """Release models and close the event loop"""
+        if not self.ready:
+            return
+        self.loop.run_until_complete(self.ai_service.cleanup())
+        self.loop.run_until_complete(self.rag_service.cleanup())
+        from app.services.pricing_service import close_pricing_clients
+        self.loop.run_until_complete(close_pricing_clients())
+        self.loop.close()
+        self.loop = None
+
+
+worker_state = WorkerState()
+
+
+@celery_setup_logging.connect
+def configure_worker_logging(**kwargs):
+    """Use the application logging setup instead of Celery's default"""
+    setup_logging()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Load models when a pool process starts"""
+    worker_state.initialize()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Release models when a pool process exits"""
+    worker_state.cleanup()
+
+
+async def process_document_background(
+    document_id: int,
+    ai_service,
+    rag_service,
+    db: Optional[Session] = None
+):
+    """
+    Process document and generate analysis
+
+    Reuses ``db`` when the caller already holds a session; otherwise uses the
+    worker's scoped session and releases it when done.
+    """
+    from app.services.analysis_service import AnalysisService
+
+    owns_session = db is None
+    if owns_session:
+        db = ScopedSession()
+    try:
+        logger.info(f"Starting background processing for document {document_id}")
+
+        # Create service instances
+        doc_service = DocumentService(db)
+        analysis_service = AnalysisService(db, ai_service, rag_service)
+
+        # Update status
+        doc_service.update_status(document_id, DocumentStatus.PROCESSING)
+
+        # Process document
+        await analysis_service.process_document(document_id)
+
+        # Update status
+        doc_service.update_status(document_id, DocumentStatus.COMPLETED)
+
+        logger.info(f"Completed processing for document {document_id}")
+
+    except Exception as e:
+        logger.error(f"Error processing document {document_id}: {str(e)}", exc_info=True)
+        doc_service.update_status(document_id, DocumentStatus.FAILED, error=str(e))
+    finally:
+        if owns_session:
+            ScopedSession.remove()
+
+
+@celery_app.task(name="analyses.process_document")
+def process_document_analysis(document_id: int):
+    """
+    Celery entry point for document analysis
+    """
+    # Solo/threaded pools don't emit worker_process_init
+    if not worker_state.ready:
+        worker_state.initialize()
+
+    worker_state.loop.run_until_complete(
+        process_document_background(
+            document_id,
+            worker_state.ai_service,
+            worker_state.rag_service
+        )
+    )
+
+
+async def process_documents_background(document_ids: List[int], ai_service, rag_service):
+    """
+    Process a batch of documents, sharing one spaCy pass across all of them
+    """
+    from app.services.analysis_service import AnalysisService
+
+    db = ScopedSession()
+    doc_service = DocumentService(db)
+    finished = set()
+    try:
+        analysis_service = AnalysisService(db, ai_service, rag_service)
+
+        for document_id in document_ids:
+            doc_service.update_status(document_id, DocumentStatus.PROCESSING)
+
+        errors = await analysis_service.process_documents(document_ids)
+
+        for document_id in document_ids:
+            if document_id in errors:
+                doc_service.update_status(document_id, DocumentStatus.FAILED, error=errors[document_id])
+            else:
+                doc_service.update_status(document_id, DocumentStatus.COMPLETED)
+            finished.add(document_id)
+
+        logger.info(f"Completed batch of {len(document_ids)} documents, {len(errors)} failed")
+
+    except Exception as e:
+        logger.error(f"Error processing batch {document_ids}: {str(e)}", exc_info=True)
+        db.rollback()
+        # Don't leave the rest of the batch stuck in PROCESSING
+        for document_id in document_ids:
+            if document_id not in finished:
+                doc_service.update_status(document_id, DocumentStatus.FAILED, error=str(e))
+    finally:
+        ScopedSession.remove()
+
+
+@celery_app.task(name="analyses.process_documents")
+def process_documents_analysis(document_ids: List[int]):
+    """
+    Celery entry point for batch document analysis
+    """
+    if not worker_state.ready:
+        worker_state.initialize()
+
+    worker_state.loop.run_until_complete(
+        process_documents_background(
+            document_ids,
+            worker_state.ai_service,
+            worker_state.rag_service
+        )
+    )
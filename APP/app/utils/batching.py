@@ -0,0 +1,109 @@
+"""
+Micro-batching for model inference
+Coalesces concurrent single-item requests into one batched model call
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Queue items and process them in batches of up to ``max_batch``
+
+    A batch is dispatched once it is full or ``max_wait_ms`` after its first
+    item arrived, whichever comes first. ``process_batch`` must return one
+    result per item, in order.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        self.process_batch = process_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, item: T) -> R:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            old_queue = self._queue
+            self._queue = asyncio.Queue()
+            # Hand items a dead worker never picked up to the new one; futures of
+            # another (closed) event loop have nobody left waiting on them
+            while old_queue is not None and not old_queue.empty():
+                pending = old_queue.get_nowait()
+                pending_future = pending[1]
+                if pending_future.get_loop() is loop and not pending_future.done():
+                    self._queue.put_nowait(pending)
+            self._worker = asyncio.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def close(self):
+        """Stop the dispatch task; queued and in-flight items are cancelled"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            future.cancel()
+        self._worker = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[Tuple[T, asyncio.Future]] = [await self._queue.get()]
+            try:
+                deadline = loop.time() + self.max_wait
+
+                while len(batch) < self.max_batch:
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+                await self._dispatch(batch)
+            except BaseException:
+                # Cancelled (close) or crashed with items already off the queue
+                for _, future in batch:
+                    if not future.done():
+                        future.cancel()
+                raise
+
+    async def _dispatch(self, batch: List[Tuple[T, asyncio.Future]]):
+        items = [item for item, _ in batch]
+        try:
+            results = await self.process_batch(items)
+        except Exception as e:
+            logger.error(f"Batch of {len(items)} failed: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -2,17 +2,35 @@
 File utility functions
 """
 import hashlib
-import uuid
+import mmap
+import os
+import sys
 from pathlib import Path
-from datetime import datetime
+import time
+
+
+# str.translate table keeping only ASCII alphanumerics, '-' and '_'
+_ASCII_SAFE_FILENAME_TABLE = {
+    codepoint: (codepoint if chr(codepoint).isalnum() or chr(codepoint) in "-_" else None)
+    for codepoint in range(128)
+}
+
+
+def client_basename(filename: str) -> str:
+    """
+    Strip any directory components from a client-supplied filename
+    """
+    # Browsers on Windows may send backslash-separated paths
+    return Path(filename.replace("\\", "/")).name
 
 
 def generate_unique_filename(original_filename: str) -> str:
     """
     Generate a unique filename while preserving the extension
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = str(uuid.uuid4())[:8]
+    # Same local-time stamp as before, without building a datetime
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    unique_id = os.urandom(4).hex()
     
     # Get extension
     path = Path(original_filename)
@@ -20,7 +38,11 @@ def generate_unique_filename(original_filename: str) -> str:
     name = path.stem
     
     # Create unique filename
-    safe_name = "".join(c for c in name if c.isalnum() or c in ('-', '_'))[:50]
+    # One C-level pass for ASCII names; others keep Unicode alphanumerics
+    if name.isascii():
+        safe_name = name.translate(_ASCII_SAFE_FILENAME_TABLE)[:50]
+    else:
+        safe_name = "".join(c for c in name if c.isalnum() or c in ('-', '_'))[:50]
     unique_filename = f"{safe_name}_{timestamp}_{unique_id}{ext}"
     
     return unique_filename
@@ -30,8 +52,20 @@ def compute_file_hash(file_path: str) -> str:
     """
     Compute SHA256 hash of a file
     """
-    sha256_hash = hashlib.sha256()
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        # Hash straight over the page cache; empty files (which mmap rejects)
+        # and non-regular files fall back to reads
+        if os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                return hashlib.sha256(mm).hexdigest()
+        
+        # file_digest runs the read loop in C
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        
+        sha256_hash = hashlib.sha256()
+        for byte_block in iter(lambda: f.read(1 << 20), b""):
             sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
+        return sha256_hash.hexdigest()
@@ -0,0 +1,60 @@
+"""
+Semantic result cache
+Serves a stored result when a new query embedding is close enough to a cached one
+"""
+from typing import Generic, List, Optional, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+class SemanticCache(Generic[T]):
+    """
+    Fixed-size cache keyed by L2-normalized embeddings
+
+    ``get`` returns the result of the most similar cached query when its cosine
+    similarity is at least ``threshold``. When full, ``put`` overwrites the
+    least recently used slot. Lookups are a single matrix-vector product over
+    at most ``capacity`` rows.
+    """
+
+    def __init__(self, dim: int, capacity: int = 512, threshold: float = 0.9):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._results: List[Optional[T]] = [None] * capacity
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._size = 0
+        self._clock = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, vector: np.ndarray) -> Optional[T]:
+        if self._size == 0:
+            return None
+        scores = self._vectors[:self._size] @ vector
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        self._touch(best)
+        return self._results[best]
+
+    def put(self, vector: np.ndarray, result: T):
+        if self._size < self.capacity:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(np.argmin(self._last_used))
+        self._vectors[slot] = vector
+        self._results[slot] = result
+        self._touch(slot)
+
+    def clear(self):
+        self._results = [None] * self.capacity
+        self._size = 0
+
+    def _touch(self, slot: int):
+        self._clock += 1
+        self._last_used[slot] = self._clock
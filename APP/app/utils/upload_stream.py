@@ -0,0 +1,129 @@
+"""
+Streaming multipart/form-data reader for file uploads
+Parses the request body incrementally so file bytes are written once,
+without Starlette's SpooledTemporaryFile staging copy
+"""
+from typing import AsyncIterator, Dict, List, Optional
+
+from multipart.exceptions import MultipartParseError
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.requests import Request
+
+
+class UploadStreamError(ValueError):
+    """Raised when the request body is not a usable multipart upload"""
+
+
+class StreamingFileUpload:
+    """
+    Read a single file field from a multipart request as it arrives
+    """
+
+    def __init__(self, request: Request, field_name: str = "file"):
+        content_type, params = parse_options_header(request.headers.get("content-type", ""))
+        if content_type != b"multipart/form-data" or b"boundary" not in params:
+            raise UploadStreamError("Expected a multipart/form-data request")
+
+        self.field_name = field_name
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+
+        self._body = request.stream().__aiter__()
+        self._exhausted = False
+        self._pending: List[bytes] = []
+        self._in_target = False
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+
+        self._parser = MultipartParser(
+            params[b"boundary"],
+            callbacks={
+                "on_part_begin": self._on_part_begin,
+                "on_header_field": self._on_header_field,
+                "on_header_value": self._on_header_value,
+                "on_header_end": self._on_header_end,
+                "on_headers_finished": self._on_headers_finished,
+                "on_part_data": self._on_part_data,
+                "on_part_end": self._on_part_end,
+            },
+        )
+
+    async def start(self) -> None:
+        """Consume the body until the file part's headers have been parsed"""
+        while self.filename is None:
+            if not await self._feed():
+                raise UploadStreamError(f"Missing file field '{self.field_name}'")
+
+    async def iter_data(self, min_chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        """Yield the file's bytes, coalesced into chunks of at least ``min_chunk_size``"""
+        buffer = bytearray()
+        while True:
+            more = await self._feed()
+            for piece in self._pending:
+                buffer += piece
+            self._pending.clear()
+            if len(buffer) >= min_chunk_size or (not more and buffer):
+                yield bytes(buffer)
+                buffer.clear()
+            if not more:
+                return
+
+    async def _feed(self) -> bool:
+        """Push the next body chunk through the parser; False once the body ends"""
+        if self._exhausted:
+            return False
+        try:
+            chunk = await self._body.__anext__()
+        except StopAsyncIteration:
+            self._exhausted = True
+            self._write(None)
+            return False
+        if chunk:
+            self._write(chunk)
+        return True
+
+    def _write(self, chunk: Optional[bytes]) -> None:
+        try:
+            if chunk is None:
+                self._parser.finalize()
+            else:
+                self._parser.write(chunk)
+        except MultipartParseError as e:
+            raise UploadStreamError(f"Malformed multipart body: {e}") from e
+
+    # Parser callbacks
+
+    def _on_part_begin(self) -> None:
+        self._headers = {}
+        self._in_target = False
+
+    def _on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def _on_header_end(self) -> None:
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        is_target = (
+            self.filename is None
+            and options.get(b"name", b"").decode("latin-1") == self.field_name
+            and b"filename" in options
+        )
+        if is_target:
+            self._in_target = True
+            self.filename = options[b"filename"].decode("utf-8", errors="replace")
+            self.content_type = self._headers.get(b"content-type", b"").decode("latin-1") or None
+
+    def _on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_target:
+            self._pending.append(data[start:end])
+
+    def _on_part_end(self) -> None:
+        self._in_target = False